@@ -5,16 +5,19 @@ Base Plot - 基础绘图功能
 提供直方图的基本绘图能力
 """
 
+import logging
+
 import numpy as np
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 from matplotlib.widgets import SpanSelector
 import matplotlib.gridspec as gridspec
-from scipy import stats
 from PyQt6.QtCore import pyqtSignal
 
-from .plot_utils import RecursionGuard, DataCleaner, AxisCalculator
+from .plot_utils import RecursionGuard, DataCleaner, AxisCalculator, HistogramCalculator, LineDownsampler
+from .kde_worker import KdeRunner
+
+logger = logging.getLogger(__name__)
 
 
 class BasePlot(FigureCanvas):
@@ -54,6 +57,17 @@ class BasePlot(FigureCanvas):
         self.kde_line = None
         self.invert_data = False
         self.file_name = ""
+        # 取反高亮数据的复用缓冲区，移动高亮区域时不再每次分配新数组
+        self._neg_buf = None
+        # 主视图ax3最近一次直方图的(高亮范围, 箱数, 取反)及结果，subplot3可直接复用
+        self._ax3_hist_key = None
+        self._ax3_hist = None
+        # KDE曲线在后台线程计算，完成后再添加到图上
+        self.kde_runner = KdeRunner(self)
+        # 全数据图的降采样折线及其(起点, 终点, 桶数)；缩放、平移或调整画布大小后按可见范围重新降采样
+        self._full_line = None
+        self._full_line_key = None
+        self.mpl_connect('resize_event', self._on_full_view_changed)
         
         # 初始化选择器优化定时器
         self._init_span_updater()
@@ -107,8 +121,12 @@ class BasePlot(FigureCanvas):
             print("Warning: Data became empty after cleaning")
             return
         
-        # 保存数据和参数
+        # 保存数据和参数（数据变化时释放取反缓冲区和已缓存的直方图）
         self.data = data
+        self._neg_buf = None
+        self._ax3_hist_key = None
+        self._ax3_hist = None
+        self.kde_runner.cancel()
         self.sampling_rate = sampling_rate
         self.bins = bins
         self.log_x = log_x
@@ -135,8 +153,14 @@ class BasePlot(FigureCanvas):
             print("Warning: Plot data became invalid after processing")
             return
         
-        # 绘制全数据图
-        self.ax1.plot(time_axis, plot_data, linewidth=0.7)
+        # 绘制全数据图（按像素宽度M4降采样，完整细节在高亮区域子图中显示）
+        n_buckets = self._line_buckets()
+        line_idx = LineDownsampler.m4_indices(plot_data, n_buckets)
+        if line_idx is None:
+            self._full_line, = self.ax1.plot(time_axis, plot_data, linewidth=0.7)
+        else:
+            self._full_line, = self.ax1.plot(time_axis[line_idx], plot_data[line_idx], linewidth=0.7)
+        self._full_line_key = (0, len(plot_data), n_buckets)
         
         # 设置初始高亮区域
         self._set_initial_highlight_region(data, time_axis)
@@ -149,6 +173,8 @@ class BasePlot(FigureCanvas):
         
         # 设置轴范围和比例
         self._configure_axes(plot_data, time_axis)
+        # ax1.clear()会清除坐标轴回调，每次绘图后重新连接
+        self.ax1.callbacks.connect('xlim_changed', self._on_full_view_changed)
         
         # 创建SpanSelector
         self._create_span_selector()
@@ -157,7 +183,39 @@ class BasePlot(FigureCanvas):
         self.fig.tight_layout(pad=0.5)
         self.fig.subplots_adjust(left=0.08, right=0.99, wspace=0.05)
         
-        self.guard.throttled_draw(self)
+        self.draw_idle()
+    
+    def _line_buckets(self):
+        """全数据图的降采样桶数（每个像素列一个桶）"""
+        return int(self.fig.get_figwidth() * self.fig.dpi)
+    
+    def _on_full_view_changed(self, *args):
+        """ax1缩放/平移或画布大小变化时刷新全数据折线"""
+        self._refresh_full_line()
+    
+    def _refresh_full_line(self):
+        """按ax1当前可见范围和画布宽度重新M4降采样全数据折线，放大到像素级时显示原始采样点"""
+        if self.data is None or self._full_line is None:
+            return
+        
+        n = len(self.data)
+        x_min, x_max = sorted(self.ax1.get_xlim())
+        # 两端各多取一个点，使折线延伸到坐标轴边缘
+        lo = min(max(int(np.floor(x_min * self.sampling_rate)) - 1, 0), n)
+        hi = max(min(int(np.ceil(x_max * self.sampling_rate)) + 2, n), lo)
+        n_buckets = self._line_buckets()
+        key = (lo, hi, n_buckets)
+        if key == self._full_line_key:
+            return
+        self._full_line_key = key
+        
+        segment = self.data[lo:hi]
+        if self.invert_data:
+            segment = -segment
+        line_idx = LineDownsampler.m4_indices(segment, n_buckets)
+        if line_idx is None:
+            line_idx = np.arange(len(segment))
+        self._full_line.set_data((lo + line_idx) / self.sampling_rate, segment[line_idx])
     
     def _reset_axes_labels(self):
         """重新设置轴标签和标题"""
@@ -195,9 +253,27 @@ class BasePlot(FigureCanvas):
             alpha=0.3, color='yellow'
         )
     
+    def _highlighted_data(self):
+        """高亮区域数据（已应用取反），取反时写入复用的缓冲区"""
+        view = self.data[self.highlight_min:self.highlight_max]
+        if not self.invert_data:
+            return view
+        
+        if self._neg_buf is None or len(self._neg_buf) < len(self.data) or self._neg_buf.dtype != self.data.dtype:
+            self._neg_buf = np.empty(len(self.data), dtype=self.data.dtype)
+        highlighted_data = self._neg_buf[:len(view)]
+        np.negative(view, out=highlighted_data)
+        return highlighted_data
+    
+    def get_highlight_histogram(self, bins):
+        """当前高亮区域在ax3中已算好的(counts, bin_edges)；高亮范围、箱数或取反已变化时返回None"""
+        if self._ax3_hist_key != (self.highlight_min, self.highlight_max, bins, self.invert_data):
+            return None
+        return self._ax3_hist
+    
     def _plot_highlighted_region(self, data, time_axis):
         """绘制高亮区域数据"""
-        highlighted_data = -data[self.highlight_min:self.highlight_max] if self.invert_data else data[self.highlight_min:self.highlight_max]
+        highlighted_data = self._highlighted_data()
         highlighted_data = self.data_cleaner.clean_data(highlighted_data)
         highlighted_time = time_axis[self.highlight_min:self.highlight_max]
         
@@ -205,12 +281,20 @@ class BasePlot(FigureCanvas):
     
     def _plot_histogram(self):
         """绘制直方图"""
-        highlighted_data = -self.data[self.highlight_min:self.highlight_max] if self.invert_data else self.data[self.highlight_min:self.highlight_max]
+        highlighted_data = self._highlighted_data()
         highlighted_data = self.data_cleaner.clean_data(highlighted_data)
         
+        return self._draw_ax3_histogram(highlighted_data)
+    
+    def _draw_ax3_histogram(self, highlighted_data):
+        """在ax3绘制水平直方图（先用均匀分箱快速路径计数，再按权重绘制，避免ax.hist对全部数据再分箱一次）"""
+        counts, bin_edges = HistogramCalculator.uniform_histogram(highlighted_data, self.bins)
+        self._ax3_hist_key = (self.highlight_min, self.highlight_max, self.bins, self.invert_data)
+        self._ax3_hist = (counts, bin_edges)
         counts, bins, _ = self.ax3.hist(
-            highlighted_data, 
-            bins=self.bins, 
+            bin_edges[:-1],
+            bins=bin_edges,
+            weights=counts,
             orientation='horizontal',
             alpha=0.7
         )
@@ -239,7 +323,7 @@ class BasePlot(FigureCanvas):
         # 不要设置 ax3 的 Y 轴为对数刻度，因为这会影响与 ax2 共享的 amplitude 轴
         
         # 设置高亮区域Y轴范围
-        highlighted_data = -self.data[self.highlight_min:self.highlight_max] if self.invert_data else self.data[self.highlight_min:self.highlight_max]
+        highlighted_data = self._highlighted_data()
         highlighted_data = self.data_cleaner.clean_data(highlighted_data)
         if len(highlighted_data) > 0:
             h_y_min, h_y_max = self.axis_calc.calculate_safe_ylim(highlighted_data)
@@ -272,6 +356,8 @@ class BasePlot(FigureCanvas):
             
         try:
             self.guard.set_updating("update_highlighted_plots", True)
+            # ax3即将清除，尚未返回的KDE结果不再需要
+            self.kde_runner.cancel()
             
             # 验证和修正高亮区域索引
             self._validate_highlight_indices()
@@ -290,11 +376,11 @@ class BasePlot(FigureCanvas):
             self.ax3.tick_params(labelsize=8, pad=1)
             
             # 获取高亮区域数据
-            highlighted_data = -self.data[self.highlight_min:self.highlight_max] if self.invert_data else self.data[self.highlight_min:self.highlight_max]
+            highlighted_data = self._highlighted_data()
             highlighted_data = self.data_cleaner.clean_data(highlighted_data)
             
-            time_axis = np.arange(len(self.data)) / self.sampling_rate
-            highlighted_time = time_axis[self.highlight_min:self.highlight_max]
+            # 只生成高亮区间的时间轴，无需构造整条时间轴
+            highlighted_time = np.arange(self.highlight_min, self.highlight_max) / self.sampling_rate
             
             if highlighted_data is None or len(highlighted_data) == 0 or len(highlighted_time) == 0:
                 print("Warning: Empty highlighted region detected, skipping plot update")
@@ -308,12 +394,7 @@ class BasePlot(FigureCanvas):
             self.ax2.plot(highlighted_time, highlighted_data, linewidth=0.7)
             
             # 绘制直方图
-            counts, bins, _ = self.ax3.hist(
-                highlighted_data, 
-                bins=self.bins, 
-                orientation='horizontal',
-                alpha=0.7
-            )
+            counts, bins = self._draw_ax3_histogram(highlighted_data)
             
             # 修复：使用更宽松的对数刻度有效性检查
             # 只要有任何一个bin有数据就可以使用对数刻度
@@ -343,10 +424,8 @@ class BasePlot(FigureCanvas):
                 if self.show_kde and len(highlighted_data) > 1:
                     self.plot_kde(highlighted_data)
                     
-        except Exception as e:
-            print(f"Error in update_highlighted_plots: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in update_highlighted_plots")
         finally:
             self.guard.set_updating("update_highlighted_plots", False)
     
@@ -359,26 +438,36 @@ class BasePlot(FigureCanvas):
                 pass
         
         try:
-            if len(np.unique(data)) < 2:
-                return
-                
-            density = stats.gaussian_kde(data)
-            
             min_val = np.min(data)
             max_val = np.max(data)
-            xs = np.linspace(min_val, max_val, 1000)
-            ys = density(xs)
+            if min_val == max_val:
+                return
             
-            bins_in_range = self.bins * (max_val - min_val) / (np.max(data) - np.min(data))
-            bin_width = (max_val - min_val) / bins_in_range
+            # 按箱宽和样本数把密度缩放到直方图计数的尺度
+            bin_width = (max_val - min_val) / self.bins
             scaling_factor = bin_width * len(data)
-            ys = ys * scaling_factor
             
-            self.kde_line, = self.ax3.plot(ys, xs, 'r-', linewidth=2)
+            # 密度在后台线程计算，完成后再绘制（期间高亮区域变化时结果直接丢弃）
+            self.kde_runner.request(data, min_val, max_val, 1000,
+                                    lambda xs, ys: self._draw_kde_line(xs, ys * scaling_factor))
             
         except Exception as e:
             print(f"Error plotting KDE: {e}")
     
+    def _draw_kde_line(self, xs, ys):
+        """把后台算好的KDE曲线画到ax3上"""
+        if not self.show_kde:
+            return
+        try:
+            self.kde_line, = self.ax3.plot(ys, xs, 'r-', linewidth=2)
+            self.draw_idle()
+        except Exception as e:
+            print(f"Error plotting KDE: {e}")
+    
+    def wait_for_kde(self):
+        """等待后台KDE计算完成并画到图上（导出或复制图像前调用）"""
+        self.kde_runner.wait()
+    
     def _init_span_updater(self):
         """初始化延时更新定时器"""
         self.span_update_timer = None
@@ -432,25 +521,17 @@ class BasePlot(FigureCanvas):
             self.highlight_max = max_idx
             
             # 更新高亮区域绘图
-            if self.highlight_region:
-                self.highlight_region.remove()
-            
-            time_axis = np.arange(len(self.data)) / self.sampling_rate
-            self.highlight_region = self.ax1.axvspan(
-                time_axis[self.highlight_min], 
-                time_axis[self.highlight_max], 
-                alpha=0.3, color='yellow'
-            )
+            self._redraw_highlight_span()
             
             # 清除拟合数据（因为选择了新的高亮区域）
             if hasattr(self, 'shared_fit_data') and self.shared_fit_data and self.shared_fit_data.has_fits():
-                print("[Fix] Clearing shared fit data due to region selection")
+                logger.debug("[Fix] Clearing shared fit data due to region selection")
                 self.shared_fit_data.clear_fits()
                 
                 # 通知父组件清除相关显示
                 if hasattr(self, 'parent_dialog') and self.parent_dialog:
                     if hasattr(self.parent_dialog, '_clear_shared_fits_on_data_change'):
-                        print("[Fix] Calling parent dialog clear method from region selection")
+                        logger.debug("[Fix] Calling parent dialog clear method from region selection")
                         self.parent_dialog._clear_shared_fits_on_data_change()
             
             # 更新子图2和子图3（传递clear_fits=True以确保清除拟合显示）
@@ -462,11 +543,23 @@ class BasePlot(FigureCanvas):
                 else:
                     self.update_highlighted_plots()
             
-            self.guard.throttled_draw(self)
+            self.draw_idle()
             
         except Exception as e:
             print(f"Error in _update_span: {e}")
     
+    def _redraw_highlight_span(self):
+        """按当前高亮索引重新绘制全数据图上的高亮区域"""
+        if self.highlight_region:
+            self.highlight_region.remove()
+        
+        # 直接由索引换算时间，避免每次移动都构造整条时间轴
+        self.highlight_region = self.ax1.axvspan(
+            self.highlight_min / self.sampling_rate, 
+            self.highlight_max / self.sampling_rate, 
+            alpha=0.3, color='yellow'
+        )
+    
     def _validate_highlight_indices(self):
         """验证和修正高亮区域索引"""
         if self.data is None or len(self.data) == 0:
@@ -489,7 +582,7 @@ class BasePlot(FigureCanvas):
         """更新直方图箱数"""
         self.bins = bins
         self.update_highlighted_plots()
-        self.draw()
+        self.draw_idle()
     
     def set_log_x(self, enabled):
         """设置X轴对数显示"""
@@ -503,7 +596,7 @@ class BasePlot(FigureCanvas):
             else:
                 self.ax3.set_xscale('linear')
             
-            self.draw()
+            self.draw_idle()
     
     def set_log_y(self, enabled):
         """设置Y轴对数显示"""
@@ -524,14 +617,14 @@ class BasePlot(FigureCanvas):
             else:
                 self.ax3.set_xscale('linear')
             
-            self.draw()
+            self.draw_idle()
     
     def set_kde(self, enabled):
         """设置KDE显示"""
         if self.show_kde != enabled:
             self.show_kde = enabled
             self.update_highlighted_plots()
-            self.draw()
+            self.draw_idle()
     
     def set_invert_data(self, enabled):
         """设置数据取反"""
@@ -575,24 +668,16 @@ class BasePlot(FigureCanvas):
         
         # 清除拟合数据（因为高亮区域大小变化了）
         if hasattr(self, 'shared_fit_data') and self.shared_fit_data and self.shared_fit_data.has_fits():
-            print("[Fix] Clearing shared fit data due to highlight size change")
+            logger.debug("[Fix] Clearing shared fit data due to highlight size change")
             self.shared_fit_data.clear_fits()
             
             # 通知父组件清除相关显示
             if hasattr(self, 'parent_dialog') and self.parent_dialog:
                 if hasattr(self.parent_dialog, '_clear_shared_fits_on_data_change'):
-                    print("[Fix] Calling parent dialog clear method from highlight size change")
+                    logger.debug("[Fix] Calling parent dialog clear method from highlight size change")
                     self.parent_dialog._clear_shared_fits_on_data_change()
         
-        if self.highlight_region:
-            self.highlight_region.remove()
-        
-        time_axis = np.arange(len(self.data)) / self.sampling_rate
-        self.highlight_region = self.ax1.axvspan(
-            time_axis[self.highlight_min], 
-            time_axis[self.highlight_max], 
-            alpha=0.3, color='yellow'
-        )
+        self._redraw_highlight_span()
         
         # 更新高亮区域显示（传递clear_fits=True以确保清除拟合显示）
         if hasattr(self, 'update_highlighted_plots'):
@@ -603,7 +688,7 @@ class BasePlot(FigureCanvas):
             else:
                 self.update_highlighted_plots()
         
-        self.guard.throttled_draw(self)
+        self.draw_idle()
     
     def _check_log_scale_validity(self):
         """检查数据是否适合对数刻度"""
@@ -612,14 +697,15 @@ class BasePlot(FigureCanvas):
                 if self.data is None:
                     return False
                 
-                highlighted_data = -self.data[self.highlight_min:self.highlight_max] if self.invert_data else self.data[self.highlight_min:self.highlight_max]
-                highlighted_data = self.data_cleaner.clean_data(highlighted_data)
+                # 取反只影响分箱方向，交给直方图计算处理，不复制取反数据
+                highlighted_data = self.data_cleaner.clean_data(self.data[self.highlight_min:self.highlight_max])
                 
                 if highlighted_data is None or len(highlighted_data) == 0:
                     return False
                 
                 try:
-                    counts, _ = np.histogram(highlighted_data, bins=self.bins)
+                    counts, _ = HistogramCalculator.uniform_histogram(highlighted_data, self.bins,
+                                                                      invert=self.invert_data)
                     # 修复：只要有任何一个bin有数据就可以使用对数刻度
                     # matplotlib可以正确处理包含0值的直方图
                     return np.any(counts > 0)
@@ -9,7 +9,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                            QSpinBox, QSlider, QFormLayout,
                            QPushButton, QDoubleSpinBox, QComboBox, QCheckBox,
                            QSizePolicy)
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QSignalBlocker
 
 
 class HistogramControlPanel(QWidget):
@@ -41,6 +41,11 @@ class HistogramControlPanel(QWidget):
         self.position_timer.setSingleShot(True)
         self.position_timer.setInterval(150)  # 增加到150ms的延迟，减少信号频率
         
+        # 箱数输入框同样合并连续变化（按住箭头/滚轮/逐位输入），只在停下后重绘
+        self.bins_timer = QTimer(self)
+        self.bins_timer.setSingleShot(True)
+        self.bins_timer.setInterval(150)
+        
         # 【修复点】添加信号发送防护
         self._emitting_size_signal = False
         self._emitting_position_signal = False
@@ -52,6 +57,15 @@ class HistogramControlPanel(QWidget):
         # 设置UI
         self.setup_ui()
         
+        # 当前绘图选项，随控件变化同步更新，重绘时无需逐个读取控件
+        self._plot_kwargs = {
+            'bins': self.bins_spin.value(),
+            'log_x': self.log_x_check.isChecked(),
+            'log_y': self.log_y_check.isChecked(),
+            'show_kde': self.kde_check.isChecked(),
+            'invert_data': self.invert_data_check.isChecked(),
+        }
+        
         # 连接信号
         self.connect_signals()
     
@@ -138,8 +152,9 @@ class HistogramControlPanel(QWidget):
     
     def connect_signals(self):
         """连接信号与槽"""
-        # 直方图箱数变化
-        self.bins_spin.valueChanged.connect(self.bins_changed)
+        # 直方图箱数变化 - 使用延时优化
+        self.bins_spin.valueChanged.connect(self.on_bins_spin_changed)
+        self.bins_timer.timeout.connect(self.emit_bins_changed)
         
         # 高亮区域大小变化 - 使用延时优化
         self.highlight_size_slider.valueChanged.connect(self.on_size_slider_moved)
@@ -160,6 +175,16 @@ class HistogramControlPanel(QWidget):
         # 清除高斯拟合按钮 (已移动到右侧面板)
         # self.clear_fits_btn.clicked.connect(self.on_clear_fits_clicked)
     
+    def on_bins_spin_changed(self, value):
+        """处理箱数变化并使用延时优化"""
+        self._plot_kwargs['bins'] = value
+        # 重新启动定时器，让用户停止调整后才发送信号
+        self.bins_timer.start()
+    
+    def emit_bins_changed(self):
+        """定时器超时后发送箱数变化信号"""
+        self.bins_changed.emit(self.bins_spin.value())
+    
     def on_size_slider_moved(self, value):
         """处理滑块移动事件并使用延时优化"""
         self.highlight_size_label.setText(f"{value}%")
@@ -198,24 +223,32 @@ class HistogramControlPanel(QWidget):
     
     def on_log_x_changed(self, state):
         """处理X轴对数显示变化"""
-        self.log_x_changed.emit(state == Qt.CheckState.Checked.value)
+        self._plot_kwargs['log_x'] = state == Qt.CheckState.Checked.value
+        self.log_x_changed.emit(self._plot_kwargs['log_x'])
     
     def on_log_y_changed(self, state):
         """处理Y轴对数显示变化"""
-        self.log_y_changed.emit(state == Qt.CheckState.Checked.value)
+        self._plot_kwargs['log_y'] = state == Qt.CheckState.Checked.value
+        self.log_y_changed.emit(self._plot_kwargs['log_y'])
     
     def on_kde_changed(self, state):
         """处理KDE显示变化"""
-        self.kde_changed.emit(state == Qt.CheckState.Checked.value)
+        self._plot_kwargs['show_kde'] = state == Qt.CheckState.Checked.value
+        self.kde_changed.emit(self._plot_kwargs['show_kde'])
     
     def on_invert_data_changed(self, state):
         """处理数据取反变化"""
-        self.invert_data_changed.emit(state == Qt.CheckState.Checked.value)
+        self._plot_kwargs['invert_data'] = state == Qt.CheckState.Checked.value
+        self.invert_data_changed.emit(self._plot_kwargs['invert_data'])
     
     def get_bins(self):
         """获取直方图箱数"""
         return self.bins_spin.value()
     
+    def get_plot_kwargs(self):
+        """获取当前绘图选项（bins, log_x, log_y, show_kde, invert_data）的副本"""
+        return dict(self._plot_kwargs)
+    
     def get_highlight_size(self):
         """获取高亮区域大小百分比"""
         return self.highlight_size_slider.value()
@@ -228,6 +261,12 @@ class HistogramControlPanel(QWidget):
         """设置直方图箱数"""
         self.bins_spin.setValue(value)
     
+    def set_log_y_checked(self, checked):
+        """设置Y轴对数复选框，不发送log_y_changed信号（由调用方自行处理显示更新）"""
+        with QSignalBlocker(self.log_y_check):
+            self.log_y_check.setChecked(checked)
+        self._plot_kwargs['log_y'] = checked
+    
     def set_highlight_size(self, value):
         """设置高亮区域大小百分比"""
         self.highlight_size_slider.setValue(value)
@@ -5,12 +5,16 @@ Cursor Info Panel - Cursor信息面板
 提供cursor信息的显示、选择和删除功能
 """
 
+import logging
+
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget, 
                             QListWidgetItem, QPushButton, QLabel, QDoubleSpinBox,
                             QMessageBox, QGroupBox, QFrame)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QColor
 
+logger = logging.getLogger(__name__)
+
 
 class CursorInfoPanel(QWidget):
     """Cursor信息面板，支持多选删除功能"""
@@ -41,7 +45,7 @@ class CursorInfoPanel(QWidget):
         
         # 操作按钮组 - 改为两行布局，确保4个按钮完整显示
         button_group = QGroupBox("Cursor Controls")
-        button_group.setStyleSheet("""
+        button_group_style = """
             QGroupBox {
                 font-weight: bold;
                 font-size: 12px;
@@ -57,13 +61,13 @@ class CursorInfoPanel(QWidget):
                 padding: 0 5px 0 5px;
                 color: #333333;
             }
-        """)
+        """
         
         button_main_layout = QVBoxLayout()
         button_main_layout.setSpacing(10)  # 增大间距，防止按钮重叠
         button_main_layout.setContentsMargins(8, 12, 8, 12)  # 增大内边距，给按钮更多空间
         
-        # 统一的按钮样式 - 增强字体颜色对比度，调整高度
+        # 统一的按钮样式 - 增强字体颜色对比度，调整高度（设置在按钮组上，样式表只解析一次）
         button_style = """
             QPushButton {
                 background-color: #f5f5f5;
@@ -93,12 +97,13 @@ class CursorInfoPanel(QWidget):
             }
         """
         
+        button_group.setStyleSheet(button_group_style + button_style)
+        
         # 第一行按钮：Add 和 Delete Selected - 增大间距，避免重叠
         first_row_layout = QHBoxLayout()
         first_row_layout.setSpacing(10)  # 增大按钮间距
         
         self.add_btn = QPushButton("Add")
-        self.add_btn.setStyleSheet(button_style)
         self.add_btn.clicked.connect(self.add_cursor_requested.emit)
         # 适中宽度，确保4个按钮都能显示
         self.add_btn.setMinimumWidth(75)
@@ -106,7 +111,6 @@ class CursorInfoPanel(QWidget):
         first_row_layout.addWidget(self.add_btn)
         
         self.delete_selected_btn = QPushButton("Delete")
-        self.delete_selected_btn.setStyleSheet(button_style)
         self.delete_selected_btn.clicked.connect(self.delete_selected_cursors)
         self.delete_selected_btn.setEnabled(False)
         # 适中宽度，确保4个按钮都能显示
@@ -121,7 +125,6 @@ class CursorInfoPanel(QWidget):
         second_row_layout.setSpacing(10)  # 增大按钮间距
         
         self.clear_btn = QPushButton("Clear")
-        self.clear_btn.setStyleSheet(button_style)
         self.clear_btn.clicked.connect(self.clear_cursors_requested.emit)
         # 适中宽度，确保4个按钮都能显示
         self.clear_btn.setMinimumWidth(75)
@@ -129,7 +132,6 @@ class CursorInfoPanel(QWidget):
         second_row_layout.addWidget(self.clear_btn)
         
         self.toggle_visibility_btn = QPushButton("Hide")
-        self.toggle_visibility_btn.setStyleSheet(button_style)
         self.toggle_visibility_btn.clicked.connect(self.toggle_cursors_visibility_requested.emit)
         # 适中宽度，确保4个按钮都能显示
         self.toggle_visibility_btn.setMinimumWidth(75)
@@ -288,11 +290,11 @@ class CursorInfoPanel(QWidget):
                 canvas = self.parent_dialog.get_current_canvas()
                 if canvas and hasattr(canvas, 'get_cursor_info'):
                     cursor_info = canvas.get_cursor_info()
-                    print(f"[DEBUG] Delayed refresh found {len(cursor_info)} cursors")
-                    if cursor_info:  # 只有在有数据时才刷新
-                        self.refresh_cursor_list(cursor_info, force_update=True)
-                    else:
-                        print("[DEBUG] Delayed refresh still found no cursor data")
+                    logger.debug("Delayed refresh found %s cursors", len(cursor_info))
+                    if not cursor_info:
+                        # 仍然没有数据则确实为空（如删除了最后一个cursor），此时清空列表
+                        logger.debug("Delayed refresh still found no cursor data")
+                    self.refresh_cursor_list(cursor_info, force_update=True)
         except Exception as e:
             print(f"Error in delayed refresh: {e}")
             self._delayed_refresh_attempted = False
@@ -304,7 +306,7 @@ class CursorInfoPanel(QWidget):
             
         # 在强制更新模式下，如果数据为空，先检查是否是真实的空数据
         if force_update and not cursor_info_list:
-            print("[DEBUG] refresh_cursor_list called with empty data in force_update mode")
+            logger.debug("refresh_cursor_list called with empty data in force_update mode")
             # 在强制更新模式下，如果是空数据，可能是数据还没有同步完成
             # 稍微延迟后再试一次，但要避免无限循环
             if not hasattr(self, '_delayed_refresh_attempted'):
@@ -369,6 +371,11 @@ class CursorInfoPanel(QWidget):
         finally:
             self._updating_data = False
     
+    def _is_histogram_tab(self):
+        """父对话框当前是否在histogram tab（使用对话框记录的当前标签页，不再查询tab_widget）"""
+        return bool(self.parent_dialog and hasattr(self.parent_dialog, 'is_histogram_tab') and
+                    self.parent_dialog.is_histogram_tab())
+    
     def on_selection_changed(self):
         """处理列表选择变化 - 增加防护"""
         if self._updating_data:
@@ -398,26 +405,16 @@ class CursorInfoPanel(QWidget):
                                 if info['id'] == cursor_id:
                                     self.position_spinbox.setValue(info['y_position'])
                                     
-                                    # 检查是否在histogram tab，如果是则不启用position control
-                                    is_histogram_tab = False
-                                    if (hasattr(self.parent_dialog, 'tab_widget') and 
-                                        hasattr(self.parent_dialog.tab_widget, 'currentIndex')):
-                                        is_histogram_tab = (self.parent_dialog.tab_widget.currentIndex() == 1)
-                                    
-                                    if not is_histogram_tab:
+                                    # 在histogram tab时不启用position control
+                                    if not self._is_histogram_tab():
                                         self.position_spinbox.setEnabled(True)
                                     # 在histogram tab中保持禁用状态
                                     break
             else:
                 # 多选或无选择时禁用位置控制
                 self.selected_cursor_id = None
-                # 检查是否在histogram tab，如果不是才禁用position control
-                is_histogram_tab = False
-                if (hasattr(self.parent_dialog, 'tab_widget') and 
-                    hasattr(self.parent_dialog.tab_widget, 'currentIndex')):
-                    is_histogram_tab = (self.parent_dialog.tab_widget.currentIndex() == 1)
-                
-                if not is_histogram_tab:
+                # 不在histogram tab时才禁用position control
+                if not self._is_histogram_tab():
                     self.position_spinbox.setEnabled(False)
                 # 在histogram tab中保持原有的禁用状态
                 
@@ -426,10 +423,8 @@ class CursorInfoPanel(QWidget):
             
             self.update_statistics()
             
-        except Exception as e:
-            print(f"Error in on_selection_changed: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in on_selection_changed")
     
     def on_cursor_item_clicked(self, item):
         """处理cursor列表项被点击"""
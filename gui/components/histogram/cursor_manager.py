@@ -6,10 +6,14 @@ Cursor Manager - Cursor管理器（性能优化版本）
 🚀 性能提升：像subplot1高亮区域一样流畅的cursor拖拽
 """
 
+import logging
+
 import numpy as np
 from PyQt6.QtCore import pyqtSignal, Qt, QObject
 from .plot_utils import ColorManager, RecursionGuard
 
+logger = logging.getLogger(__name__)
+
 
 class CursorManager(QObject):
     """Cursor管理器类 - 性能优化版本"""
@@ -110,15 +114,13 @@ class CursorManager(QObject):
             
             # 重绘
             if not self.guard.is_updating("draw"):
-                self.plot_canvas.draw()
+                self.plot_canvas.draw_idle()
             
-            print(f"Added cursor with ID {cursor_id} at position {y_position}")
+            logger.debug("Added cursor with ID %s at position %s", cursor_id, y_position)
             return cursor_id
             
-        except Exception as e:
-            print(f"Error adding cursor: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error adding cursor")
             return None
         finally:
             self.guard.set_updating("add_cursor", False)
@@ -175,7 +177,8 @@ class CursorManager(QObject):
                 self.selected_cursor['line_ax3'].set_visible(original_visibility.get('ax3', True))
             
             self._is_blitting = len(self._drag_backgrounds) > 0
-            print(f"🚀 Blitting setup: {'successful' if self._is_blitting else 'failed'} with {len(self._drag_backgrounds)} clean backgrounds")
+            logger.debug("Blitting setup: %s with %s clean backgrounds",
+                         'successful' if self._is_blitting else 'failed', len(self._drag_backgrounds))
             
         except Exception as e:
             print(f"Error setting up blitting: {e}")
@@ -274,7 +277,7 @@ class CursorManager(QObject):
             self._is_blitting = False
             self._drag_backgrounds.clear()
             self._last_drag_position = None
-            print("🧹 Blitting cleanup completed")
+            logger.debug("Blitting cleanup completed")
         except Exception as e:
             print(f"Error cleaning up blitting: {e}")
     
@@ -303,7 +306,7 @@ class CursorManager(QObject):
             self.plot_canvas.is_histogram_mode and 
             hasattr(self.plot_canvas, 'ax') and 
             event.inaxes == self.plot_canvas.ax):
-            print("Cursor interaction disabled in histogram mode")
+            logger.debug("Cursor interaction disabled in histogram mode")
             return
         
         try:
@@ -385,7 +388,7 @@ class CursorManager(QObject):
                 # 使用轻量级重绘
                 self.plot_canvas.draw_idle()
                 
-                print(f"Cursor {cursor_id} drag completed at position {final_position:.4f}")
+                logger.debug("Cursor %s drag completed at position %.4f", cursor_id, final_position)
             
             self.dragging = False
             self.drag_start_y = None
@@ -414,15 +417,13 @@ class CursorManager(QObject):
             
             # 重绘
             if not self.guard.is_updating("draw"):
-                self.plot_canvas.draw()
+                self.plot_canvas.draw_idle()
             
-            print(f"Set cursors visibility to: {visible}")
+            logger.debug("Set cursors visibility to: %s", visible)
             return True
             
-        except Exception as e:
-            print(f"Error setting cursor visibility: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error setting cursor visibility")
             return False
     
     def toggle_cursors_visibility(self):
@@ -459,18 +460,16 @@ class CursorManager(QObject):
                     self._reorder_cursor_ids()
                     
                     # 重绘
-                    self.plot_canvas.draw()
+                    self.plot_canvas.draw_idle()
                     
-                    print(f"Removed cursor with ID {cursor_id}")
+                    logger.debug("Removed cursor with ID %s", cursor_id)
                     return True
             
-            print(f"Cursor with ID {cursor_id} not found")
+            logger.debug("Cursor with ID %s not found", cursor_id)
             return False
             
-        except Exception as e:
-            print(f"Error removing cursor: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error removing cursor")
             return False
     
     def clear_all_cursors(self):
@@ -498,15 +497,13 @@ class CursorManager(QObject):
             self.cursor_counter = 0
             
             # 重绘
-            self.plot_canvas.draw()
+            self.plot_canvas.draw_idle()
             
-            print("Cleared all cursors")
+            logger.debug("Cleared all cursors")
             return True
             
-        except Exception as e:
-            print(f"Error clearing cursors: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error clearing cursors")
             return False
     
     def select_cursor(self, cursor_id):
@@ -559,18 +556,24 @@ class CursorManager(QObject):
             
             # 重绘
             if not self.guard.is_updating("draw"):
-                self.plot_canvas.draw()
+                self.plot_canvas.draw_idle()
             
             return True
             
-        except Exception as e:
-            print(f"Error selecting cursor: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error selecting cursor")
             return False
         finally:
             self.guard.set_updating("select_cursor", False)
     
+    def _cursor_lines_attached(self, cursor):
+        """cursor的ax2/ax3线条是否仍在对应子图上（没有线条时视为无需更新）"""
+        for key, ax_name in (('line_ax2', 'ax2'), ('line_ax3', 'ax3')):
+            line = cursor.get(key)
+            if line is not None and line not in getattr(self.plot_canvas, ax_name).lines:
+                return False
+        return True
+    
     def update_cursor_position(self, cursor_id, new_position, fast_update=False):
         """更新cursor位置 - 优化版，支持快速更新模式"""
         try:
@@ -582,7 +585,10 @@ class CursorManager(QObject):
                         # 快速更新模式：直接修改现有线条的位置，不重建
                         fast_update_success = True
                         
-                        if 'line_ax2' in cursor and cursor['line_ax2']:
+                        # 线条已随子图重绘被清除时无法直接移动，需要重建
+                        if not self._cursor_lines_attached(cursor):
+                            fast_update_success = False
+                        elif 'line_ax2' in cursor and cursor['line_ax2']:
                             try:
                                 cursor['line_ax2'].set_ydata([new_position, new_position])
                             except Exception as e:
@@ -636,10 +642,8 @@ class CursorManager(QObject):
             
             return False
             
-        except Exception as e:
-            print(f"Error updating cursor position: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error updating cursor position")
             return False
     
     def get_cursor_info(self):
@@ -657,10 +661,8 @@ class CursorManager(QObject):
             
             return cursor_info
             
-        except Exception as e:
-            print(f"Error getting cursor info: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error getting cursor info")
             return []
     
     def refresh_cursors_after_plot_update(self):
@@ -673,7 +675,7 @@ class CursorManager(QObject):
             self.guard.set_updating("refresh_cursors_after_plot_update", True)
             
             # 加强版：每次刷新时都进行强制清理，防止残留虚线
-            print("[REFRESH_FIX] Starting enhanced cursor refresh with force cleanup...")
+            logger.debug("[REFRESH_FIX] Starting enhanced cursor refresh with force cleanup...")
             self._clear_all_cursor_lines_from_axes()
             
             # 第1步：重新创建所有cursor线条
@@ -700,12 +702,10 @@ class CursorManager(QObject):
                         visible=self.cursors_visible
                     )
             
-            print(f"[REFRESH_FIX] Enhanced refresh completed for {len(self.cursors)} cursors (completely rebuilt with force cleanup)")
+            logger.debug("[REFRESH_FIX] Enhanced refresh completed for %s cursors (completely rebuilt with force cleanup)", len(self.cursors))
                     
-        except Exception as e:
-            print(f"Error refreshing cursors after plot update: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error refreshing cursors after plot update")
         finally:
             self.guard.set_updating("refresh_cursors_after_plot_update", False)
     
@@ -751,15 +751,13 @@ class CursorManager(QObject):
                     print(f"Error removing single cursor line from histogram ax: {e}")
                 cursor['histogram_line'] = None
                 
-        except Exception as e:
-            print(f"Error clearing single cursor lines: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error clearing single cursor lines")
     
     def _clear_all_cursor_lines_from_axes(self):
         """彻底清理axes中所有cursor线条 - 强制清理方法"""
         try:
-            print("Starting complete cursor line cleanup...")
+            logger.debug("Starting complete cursor line cleanup...")
             
             # 清理ax2中的所有虚线
             if hasattr(self.plot_canvas, 'ax2') and hasattr(self.plot_canvas.ax2, 'lines'):
@@ -783,7 +781,7 @@ class CursorManager(QObject):
                         print(f"Error removing line from ax2: {e}")
                 
                 lines_after = len(self.plot_canvas.ax2.lines)
-                print(f"ax2: Removed {lines_before - lines_after} cursor lines")
+                logger.debug("ax2: Removed %s cursor lines", lines_before - lines_after)
             
             # 清理ax3中的所有虚线 - 加强版
             if hasattr(self.plot_canvas, 'ax3') and hasattr(self.plot_canvas.ax3, 'lines'):
@@ -807,7 +805,7 @@ class CursorManager(QObject):
                         print(f"Error removing line from ax3: {e}")
                 
                 lines_after = len(self.plot_canvas.ax3.lines)
-                print(f"ax3: Removed {lines_before - lines_after} cursor lines")
+                logger.debug("ax3: Removed %s cursor lines", lines_before - lines_after)
             
             # 加强版：清理在histogram模式下的self.ax中的cursor线条
             if (hasattr(self.plot_canvas, 'ax') and 
@@ -834,7 +832,7 @@ class CursorManager(QObject):
                         print(f"Error removing line from histogram ax: {e}")
                 
                 lines_after = len(self.plot_canvas.ax.lines)
-                print(f"histogram ax: Removed {lines_before - lines_after} cursor lines")
+                logger.debug("histogram ax: Removed %s cursor lines", lines_before - lines_after)
             
             # 清理cursor对象中的所有线条引用
             for cursor in self.cursors:
@@ -842,12 +840,10 @@ class CursorManager(QObject):
                 cursor['line_ax3'] = None
                 cursor['histogram_line'] = None
             
-            print("Complete cursor line cleanup finished")
+            logger.debug("Complete cursor line cleanup finished")
             
-        except Exception as e:
-            print(f"Error in complete cursor line cleanup: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in complete cursor line cleanup")
     
     def refresh_cursors_for_histogram_mode(self):
         """在直方图模式下刷新cursor显示 - 修改为不显示cursor但保留数据"""
@@ -863,17 +859,15 @@ class CursorManager(QObject):
                 
                 # 在直方图模式下不创建可视化cursor，只保留数据
                 # 这样cursor list中的信息会保留，但不会在histogram中显示
-                print(f"Cursor {cursor['id']} data preserved in histogram mode but not displayed")
+                logger.debug("Cursor %s data preserved in histogram mode but not displayed", cursor['id'])
                         
-        except Exception as e:
-            print(f"Error refreshing cursors for histogram mode: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error refreshing cursors for histogram mode")
     
     def force_clear_on_tab_switch(self):
         """在tab切换时强制清理所有cursor线条 - 修复bug专用"""
         try:
-            print("[TAB_SWITCH_FIX] Force clearing all cursor lines on tab switch...")
+            logger.debug("[TAB_SWITCH_FIX] Force clearing all cursor lines on tab switch...")
             
             # 调用强制清理方法
             self._clear_all_cursor_lines_from_axes()
@@ -884,12 +878,10 @@ class CursorManager(QObject):
                 cursor['line_ax3'] = None
                 cursor['histogram_line'] = None
             
-            print(f"[TAB_SWITCH_FIX] Force cleared all cursor lines for {len(self.cursors)} cursors")
+            logger.debug("[TAB_SWITCH_FIX] Force cleared all cursor lines for %s cursors", len(self.cursors))
             
-        except Exception as e:
-            print(f"[TAB_SWITCH_FIX] Error in force clear on tab switch: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in force clear on tab switch")
     
     def _reorder_cursor_ids(self):
         """重新排序cursor ID"""
@@ -916,7 +908,7 @@ class CursorManager(QObject):
         # 重置cursor计数器为下一个可用ID
         self.cursor_counter = len(self.cursors)
         
-        print(f"Reordered cursors: {[c['id'] for c in cursors_sorted]}")
+        logger.debug("Reordered cursors: %s", [c['id'] for c in cursors_sorted])
     
     def _find_cursor_near_click(self, event):
         """查找点击位置附近的cursor（优化精度）"""
@@ -987,12 +979,10 @@ class CursorManager(QObject):
             # 检查最近的cursor是否在容忍范围内
             if closest_cursor and closest_distance < click_tolerance:
                 mode = "histogram" if is_histogram_mode else "main view"
-                print(f"Found cursor {closest_cursor['id']} in {mode} at distance {closest_distance:.4f} (tolerance: {click_tolerance:.4f})")
+                logger.debug("Found cursor %s in %s at distance %.4f (tolerance: %.4f)", closest_cursor['id'], mode, closest_distance, click_tolerance)
                 return closest_cursor
             
-        except Exception as e:
-            print(f"Error calculating click tolerance: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error calculating click tolerance")
         
         return None
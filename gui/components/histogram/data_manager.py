@@ -22,6 +22,18 @@ class HistogramDataManager:
         self.selected_channel = None
         self.file_processor = FileDataProcessor()
         self.file_path = None
+        self._channel_cache = {}  # {channel_name: float32连续数组}
+    
+    @property
+    def file_path(self):
+        """当前文件路径"""
+        return self._file_path
+    
+    @file_path.setter
+    def file_path(self, value):
+        """设置文件路径，同时缓存文件名（每次重绘都要用作标题）"""
+        self._file_path = value
+        self.file_name = os.path.basename(value) if value else ""
     
     def load_file(self, file_path=None):
         """加载文件"""
@@ -50,6 +62,7 @@ class HistogramDataManager:
             
             # 更新数据
             self.data = data
+            self._channel_cache = {}
             
             # 获取采样率
             if "Sampling Rate" in info and isinstance(info["Sampling Rate"], str):
@@ -106,7 +119,28 @@ class HistogramDataManager:
         # 设置当前选择的通道
         self.selected_channel = channel_name
         
+        # 已转换过的通道直接返回
+        if channel_name in self._channel_cache:
+            return self._channel_cache[channel_name]
+        
         # 获取通道数据
+        channel_data = self.get_raw_channel_data(channel_name)
+        
+        # 转换为连续的float32数组：直方图和显示统计精度足够，内存带宽减半
+        if channel_data is not None:
+            try:
+                channel_data = np.ascontiguousarray(channel_data, dtype=np.float32)
+                self._channel_cache[channel_name] = channel_data
+            except (TypeError, ValueError) as e:
+                print(f"Error converting channel data to float32: {str(e)}")
+        
+        return channel_data
+    
+    def get_raw_channel_data(self, channel_name):
+        """获取指定通道的原始数据（保持原始数据类型和精度，用于导出；不改变当前选择的通道）"""
+        if self.data is None or channel_name is None:
+            return None
+        
         channel_data = None
         
         try:
@@ -144,6 +178,7 @@ class HistogramDataManager:
     def set_data(self, data, sampling_rate=None):
         """设置数据（外部直接传入）"""
         self.data = data
+        self._channel_cache = {}
         if sampling_rate is not None:
             self.sampling_rate = sampling_rate
         
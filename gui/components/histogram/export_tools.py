@@ -14,11 +14,12 @@ from datetime import datetime
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QFileDialog, QLabel, QMessageBox, 
                             QApplication, QProgressDialog)
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QThread, QEventLoop
 from PyQt6.QtGui import QIcon, QPixmap, QImage
 from PIL import Image
 
 from .settings_manager import SettingsManager
+from .plot_utils import HistogramCalculator, DataCleaner
 
 
 class ExportToolsPanel(QWidget):
@@ -78,7 +79,7 @@ class IntegratedDataExporter:
             # 获取基础文件名
             current_time = datetime.now().strftime("%Y%m%d_%H%M%S")
             if hasattr(self.dialog.data_manager, 'file_path') and self.dialog.data_manager.file_path:
-                base_name = os.path.splitext(os.path.basename(self.dialog.data_manager.file_path))[0]
+                base_name = os.path.splitext(self.dialog.data_manager.file_name)[0]
                 default_foldername = f"{base_name}_export_{current_time}"
             else:
                 default_foldername = f"histogram_export_{current_time}"
@@ -140,7 +141,7 @@ class IntegratedDataExporter:
                 return False, "Export cancelled"
                 
             hist_stats_file = os.path.join(folder_path, f"{folder_name}_histogram_stats.csv")
-            success = self._export_histogram_stats(hist_stats_file)
+            success = self._export_histogram_stats(hist_stats_file, progress)
             if success:
                 exported_files.append(os.path.basename(hist_stats_file))
             
@@ -162,7 +163,7 @@ class IntegratedDataExporter:
                 return False, "Export cancelled"
                 
             raw_data_file = os.path.join(folder_path, f"{folder_name}_raw_data.csv")
-            success = self._export_raw_data(raw_data_file)
+            success = self._export_raw_data(raw_data_file, progress)
             if success:
                 exported_files.append(os.path.basename(raw_data_file))
             
@@ -213,7 +214,7 @@ class IntegratedDataExporter:
                 f.write("# Original File Information:\n")
                 if hasattr(self.dialog.data_manager, 'file_path') and self.dialog.data_manager.file_path:
                     f.write(f"# Source File Path: {self.dialog.data_manager.file_path}\n")
-                    f.write(f"# Source File Name: {os.path.basename(self.dialog.data_manager.file_path)}\n")
+                    f.write(f"# Source File Name: {self.dialog.data_manager.file_name}\n")
                     
                     # 检查文件是否存在并获取信息
                     if os.path.exists(self.dialog.data_manager.file_path):
@@ -254,72 +255,68 @@ class IntegratedDataExporter:
             print(f"Error exporting metadata: {e}")
             return False
     
-    def _export_histogram_stats(self, file_path):
-        """导出直方图统计数据（包含原文件信息）"""
+    def _get_raw_highlight_data(self):
+        """获取当前通道高亮区域的原始精度数据（视图，未取反）；没有原始数据时返回None"""
+        data_manager = self.dialog.data_manager
+        if not hasattr(data_manager, 'get_raw_channel_data'):
+            return None
+        raw_data = data_manager.get_raw_channel_data(data_manager.selected_channel)
+        if raw_data is None:
+            return None
+        highlight_min = self.dialog.plot_canvas.highlight_min
+        highlight_max = self.dialog.plot_canvas.highlight_max
+        return np.asarray(raw_data)[highlight_min:highlight_max]
+    
+    def _export_histogram_stats(self, file_path, progress=None):
+        """导出直方图统计数据（包含原文件信息），统计计算和写文件在工作线程中进行"""
         try:
             # 检查是否在直方图标签页且有数据
-            if (self.dialog.tab_widget.currentIndex() == 1 and 
+            if (self.dialog.is_histogram_tab() and 
                 hasattr(self.dialog.subplot3_canvas, 'histogram_data')):
                 
-                data = self.dialog.subplot3_canvas.histogram_data
+                # 直方图使用当前显示的分箱，统计量由原始精度数据计算
                 hist_counts = self.dialog.subplot3_canvas.hist_counts
                 bin_edges = self.dialog.subplot3_canvas.hist_bin_edges
+                bins = None
+                data = self._get_raw_highlight_data()
+                if data is not None:
+                    invert = self.dialog.plot_canvas.invert_data
+                else:
+                    # 直方图数据可能与高亮视图共用缓冲区，复制一份交给工作线程
+                    data = np.array(self.dialog.subplot3_canvas.histogram_data)
+                    invert = False
                 
             elif hasattr(self.dialog.plot_canvas, 'data'):
-                # 使用主视图数据
-                highlight_min = self.dialog.plot_canvas.highlight_min
-                highlight_max = self.dialog.plot_canvas.highlight_max
-                data = self.dialog.plot_canvas.data[highlight_min:highlight_max]
-                
-                if self.dialog.plot_canvas.invert_data:
-                    data = -data
-                
-                # 创建直方图
+                # 使用主视图高亮区域的原始精度数据（切片为视图，分箱和统计在工作线程中按取反处理）
+                data = self._get_raw_highlight_data()
+                if data is None:
+                    highlight_min = self.dialog.plot_canvas.highlight_min
+                    highlight_max = self.dialog.plot_canvas.highlight_max
+                    data = self.dialog.plot_canvas.data[highlight_min:highlight_max]
+                invert = self.dialog.plot_canvas.invert_data
                 bins = self.dialog.histogram_control.get_bins()
-                hist_counts, bin_edges = np.histogram(data, bins=bins)
+                # 主视图ax3由float32绘图数据分箱，原始数据同为float32且区域、箱数和取反相同时直接复用，否则在工作线程中分箱
+                main_histogram = None
+                if data.dtype == np.float32:
+                    main_histogram = self.dialog.plot_canvas.get_highlight_histogram(bins)
+                hist_counts, bin_edges = main_histogram if main_histogram is not None else (None, None)
             else:
                 return False
             
-            # 计算统计信息
-            stats = {
-                "total_points": len(data),
-                "min_value": float(np.min(data)),
-                "max_value": float(np.max(data)),
-                "mean": float(np.mean(data)),
-                "median": float(np.median(data)),
-                "std_dev": float(np.std(data)),
-                "bins_count": len(hist_counts)
-            }
-            
-            # 写入CSV文件
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                # 写入文件头信息
-                csvfile.write(f"# Histogram Statistics Export\n")
-                csvfile.write(f"# Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                if hasattr(self.dialog.data_manager, 'file_path') and self.dialog.data_manager.file_path:
-                    csvfile.write(f"# Source File: {self.dialog.data_manager.file_path}\n")
-                if hasattr(self.dialog.data_manager, 'selected_channel'):
-                    csvfile.write(f"# Channel: {self.dialog.data_manager.selected_channel}\n")
-                csvfile.write("#\n")
-                
-                # 写入统计信息
-                csvfile.write("# Histogram Statistics\n")
-                for key, value in stats.items():
-                    csvfile.write(f"# {key}: {value}\n")
-                csvfile.write("#\n")
-                
-                # 写入直方图数据
-                csvfile.write("# Histogram Data\n")
-                writer = csv.writer(csvfile)
-                writer.writerow(["bin_min", "bin_max", "bin_center", "count"])
-                
-                for i in range(len(hist_counts)):
-                    bin_min = bin_edges[i]
-                    bin_max = bin_edges[i+1]
-                    bin_center = (bin_min + bin_max) / 2
-                    writer.writerow([bin_min, bin_max, bin_center, hist_counts[i]])
+            # 文件头信息
+            header_lines = [
+                "# Histogram Statistics Export",
+                f"# Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            ]
+            if hasattr(self.dialog.data_manager, 'file_path') and self.dialog.data_manager.file_path:
+                header_lines.append(f"# Source File: {self.dialog.data_manager.file_path}")
+            if hasattr(self.dialog.data_manager, 'selected_channel'):
+                header_lines.append(f"# Channel: {self.dialog.data_manager.selected_channel}")
+            header_lines.append("#")
             
-            return True
+            worker = HistogramStatsExportWorker(file_path, header_lines, data, invert, bins,
+                                                hist_counts, bin_edges)
+            return self._run_export_worker(worker, progress)
             
         except Exception as e:
             print(f"Error exporting histogram stats: {e}")
@@ -371,8 +368,8 @@ class IntegratedDataExporter:
             print(f"Error exporting fit data: {e}")
             return False
     
-    def _export_raw_data(self, file_path):
-        """导出原始数据（包含原文件信息）"""
+    def _export_raw_data(self, file_path, progress=None):
+        """导出原始数据（包含原文件信息），写文件在工作线程中进行，期间界面保持响应"""
         try:
             # 获取当前高亮区域的原始数据
             if not hasattr(self.dialog.plot_canvas, 'data'):
@@ -381,50 +378,67 @@ class IntegratedDataExporter:
             highlight_min = self.dialog.plot_canvas.highlight_min
             highlight_max = self.dialog.plot_canvas.highlight_max
             current_channel = self.dialog.data_manager.selected_channel
+            sampling_rate = self.dialog.data_manager.sampling_rate
             
-            with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-                # 写入文件头信息
-                csvfile.write(f"# Raw Data Export - Highlighted Region\n")
-                csvfile.write(f"# Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                if hasattr(self.dialog.data_manager, 'file_path') and self.dialog.data_manager.file_path:
-                    csvfile.write(f"# Source File: {self.dialog.data_manager.file_path}\n")
-                csvfile.write(f"# Selected Channel: {current_channel}\n")
-                csvfile.write(f"# Time range (samples): {highlight_min} - {highlight_max}\n")
-                csvfile.write(f"# Sampling rate: {self.dialog.data_manager.sampling_rate} Hz\n")
-                csvfile.write(f"# Time range (seconds): {highlight_min/self.dialog.data_manager.sampling_rate:.6f} - {highlight_max/self.dialog.data_manager.sampling_rate:.6f}\n")
-                csvfile.write(f"# Data points: {highlight_max - highlight_min}\n")
-                csvfile.write(f"# Data inverted: {self.dialog.plot_canvas.invert_data}\n")
-                csvfile.write("#\n")
-                
-                writer = csv.writer(csvfile)
-                
-                # 获取所有通道数据
-                channels = self.dialog.data_manager.get_channels()
-                headers = ["sample_index", "time_seconds"] + [f"channel_{ch}" for ch in channels]
-                writer.writerow(headers)
-                
-                # 写入数据
-                for i in range(highlight_min, highlight_max):
-                    time_seconds = i / self.dialog.data_manager.sampling_rate
-                    row = [i, time_seconds]
-                    for ch in channels:
-                        ch_data = self.dialog.data_manager.get_channel_data(ch)
-                        if ch_data is not None and i < len(ch_data):
-                            value = ch_data[i]
-                            # 只对选中的通道应用数据取反
-                            if ch == current_channel and self.dialog.plot_canvas.invert_data:
-                                value = -value
-                            row.append(value)
-                        else:
-                            row.append(np.nan)
-                    writer.writerow(row)
-            
-            return True
+            # 文件头信息
+            header_lines = [
+                "# Raw Data Export - Highlighted Region",
+                f"# Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            ]
+            if hasattr(self.dialog.data_manager, 'file_path') and self.dialog.data_manager.file_path:
+                header_lines.append(f"# Source File: {self.dialog.data_manager.file_path}")
+            header_lines += [
+                f"# Selected Channel: {current_channel}",
+                f"# Time range (samples): {highlight_min} - {highlight_max}",
+                f"# Sampling rate: {sampling_rate} Hz",
+                f"# Time range (seconds): {highlight_min/sampling_rate:.6f} - {highlight_max/sampling_rate:.6f}",
+                f"# Data points: {highlight_max - highlight_min}",
+                f"# Data inverted: {self.dialog.plot_canvas.invert_data}",
+                "#",
+            ]
+            
+            # 在界面线程中取出各通道高亮区域的数据副本，工作线程只负责写文件
+            channels = self.dialog.data_manager.get_channels()
+            headers = ["sample_index", "time_seconds"] + [f"channel_{ch}" for ch in channels]
+            columns = []
+            for ch in channels:
+                # 导出使用原始精度数据，绘图用的float32缓存只保留约7位有效数字
+                ch_data = self.dialog.data_manager.get_raw_channel_data(ch)
+                column = np.array(ch_data[highlight_min:highlight_max]) if ch_data is not None else np.array([])
+                # 只对选中的通道应用数据取反
+                if ch == current_channel and self.dialog.plot_canvas.invert_data:
+                    column = -column
+                columns.append(column)
+            
+            worker = RawDataExportWorker(file_path, header_lines, headers, columns,
+                                         highlight_min, highlight_max, sampling_rate)
+            return self._run_export_worker(worker, progress)
             
         except Exception as e:
             print(f"Error exporting raw data: {e}")
             return False
     
+    def _run_export_worker(self, worker, progress=None):
+        """运行导出工作线程并等待其结束，期间继续处理界面事件；返回是否导出成功"""
+        # 工作线程读取数据期间禁用导出、加载文件和通道选择（取消后进度对话框关闭，工作线程可能仍在运行）
+        locked_controls = [getattr(self.dialog, name, None) for name in ('export_tools', 'file_channel_control')]
+        locked_controls = [control for control in locked_controls if control is not None and control.isEnabled()]
+        for control in locked_controls:
+            control.setEnabled(False)
+        
+        try:
+            loop = QEventLoop()
+            worker.finished.connect(loop.quit)
+            if progress is not None:
+                progress.canceled.connect(worker.requestInterruption)
+            worker.start()
+            loop.exec()
+        finally:
+            for control in locked_controls:
+                control.setEnabled(True)
+        
+        return worker.success
+    
     def _export_main_view_image(self, file_path):
         """导出主视图图像"""
         try:
@@ -462,6 +476,126 @@ class IntegratedDataExporter:
             return False
 
 
+class RawDataExportWorker(QThread):
+    """原始数据CSV写入工作线程，避免导出大区间时阻塞界面"""
+    
+    def __init__(self, file_path, header_lines, headers, columns, start, stop, sampling_rate):
+        super().__init__()
+        self.file_path = file_path
+        self.header_lines = header_lines
+        self.headers = headers
+        self.columns = columns
+        self.start_index = start
+        self.stop_index = stop
+        self.sampling_rate = sampling_rate
+        self.success = False
+    
+    def run(self):
+        interrupted = False
+        try:
+            with open(self.file_path, 'w', newline='', encoding='utf-8') as csvfile:
+                for line in self.header_lines:
+                    csvfile.write(line + "\n")
+                
+                writer = csv.writer(csvfile)
+                writer.writerow(self.headers)
+                
+                for offset, i in enumerate(range(self.start_index, self.stop_index)):
+                    # 每写一批检查一次是否被取消
+                    if offset % 10000 == 0 and self.isInterruptionRequested():
+                        interrupted = True
+                        break
+                    row = [i, i / self.sampling_rate]
+                    for column in self.columns:
+                        # 通道长度不足时补NaN
+                        row.append(column[offset] if offset < len(column) else np.nan)
+                    writer.writerow(row)
+            
+            if interrupted:
+                # 取消时删除只写了一部分的文件，避免留下被截断的CSV
+                os.remove(self.file_path)
+                return
+            
+            self.success = True
+            
+        except Exception as e:
+            print(f"Error exporting raw data: {e}")
+
+
+class HistogramStatsExportWorker(QThread):
+    """直方图统计CSV写入工作线程：分箱和统计（含中位数）都在线程中计算"""
+    
+    def __init__(self, file_path, header_lines, data, invert, bins, hist_counts=None, bin_edges=None):
+        super().__init__()
+        self.file_path = file_path
+        self.header_lines = header_lines
+        self.data = data
+        self.invert = invert
+        self.bins = bins
+        self.hist_counts = hist_counts
+        self.bin_edges = bin_edges
+        self.success = False
+    
+    def run(self):
+        try:
+            data = self.data
+            # 原始数据可能含NaN/Inf，与绘图数据一致地清理（先复制，不修改原始数据）
+            if not np.all(np.isfinite(data)):
+                data = DataCleaner.clean_data(np.array(data))
+                if data is None:
+                    return
+            hist_counts, bin_edges = self.hist_counts, self.bin_edges
+            if hist_counts is None or bin_edges is None:
+                hist_counts, bin_edges = HistogramCalculator.uniform_histogram(data, self.bins, invert=self.invert)
+            
+            if self.isInterruptionRequested():
+                return
+            
+            # 计算统计信息（取反数据的统计量直接由原数据得到，不生成取反副本；加0.0避免输出-0.0）
+            min_value, max_value = float(np.min(data)), float(np.max(data))
+            mean, median = float(np.mean(data)), float(np.median(data))
+            if self.invert:
+                min_value, max_value = -max_value + 0.0, -min_value + 0.0
+                mean, median = -mean + 0.0, -median + 0.0
+            
+            stats = {
+                "total_points": len(data),
+                "min_value": min_value,
+                "max_value": max_value,
+                "mean": mean,
+                "median": median,
+                "std_dev": float(np.std(data)),
+                "bins_count": len(hist_counts)
+            }
+            
+            # 写入CSV文件
+            with open(self.file_path, 'w', newline='', encoding='utf-8') as csvfile:
+                for line in self.header_lines:
+                    csvfile.write(line + "\n")
+                
+                # 写入统计信息
+                csvfile.write("# Histogram Statistics\n")
+                for key, value in stats.items():
+                    csvfile.write(f"# {key}: {value}\n")
+                csvfile.write("#\n")
+                
+                # 写入直方图数据
+                csvfile.write("# Histogram Data\n")
+                writer = csv.writer(csvfile)
+                writer.writerow(["bin_min", "bin_max", "bin_center", "count"])
+                
+                for i in range(len(hist_counts)):
+                    bin_min = bin_edges[i]
+                    bin_max = bin_edges[i+1]
+                    bin_center = (bin_min + bin_max) / 2
+                    writer.writerow([bin_min, bin_max, bin_center, hist_counts[i]])
+            
+            self.success = True
+            
+        except Exception as e:
+            print(f"Error exporting histogram stats: {e}")
+
+
 class ImageClipboardManager:
     """图像剪贴板管理器"""
     
@@ -477,7 +611,8 @@ class ImageClipboardManager:
                 dpi=300,
                 bbox_inches='tight',
                 facecolor='white',
-                edgecolor='none'
+                edgecolor='none',
+                pil_kwargs={'compress_level': 0}  # 中间图像马上会被读回，不压缩以节省编码时间
             )
             main_buffer.seek(0)
             
@@ -489,7 +624,8 @@ class ImageClipboardManager:
                 dpi=300,
                 bbox_inches='tight',
                 facecolor='white',
-                edgecolor='none'
+                edgecolor='none',
+                pil_kwargs={'compress_level': 0}  # 中间图像马上会被读回，不压缩以节省编码时间
             )
             hist_buffer.seek(0)
             
@@ -515,14 +651,10 @@ class ImageClipboardManager:
             combined_image.paste(hist_image, (main_image.width, 0))
             
             # 4. 转换为QPixmap并复制到剪贴板
-            # 将PIL图像转换为字节流
-            img_buffer = io.BytesIO()
-            combined_image.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-            
-            # 转换为QImage然后QPixmap
-            qimage = QImage()
-            qimage.loadFromData(img_buffer.getvalue())
+            # 直接用像素数据构造QImage，不再经过PNG编码和解码
+            pixels = combined_image.tobytes()
+            qimage = QImage(pixels, combined_image.width, combined_image.height,
+                            3 * combined_image.width, QImage.Format.Format_RGB888)
             pixmap = QPixmap.fromImage(qimage)
             
             # 复制到剪贴板
@@ -5,6 +5,8 @@ Fit Info Panel - 拟合信息面板
 提供拟合结果的显示和交互功能
 """
 
+import logging
+
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                             QPushButton, QListWidget, QListWidgetItem, 
                             QAbstractItemView, QMenu, QDialog, QFormLayout,
@@ -13,6 +15,8 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt6.QtCore import Qt, pyqtSignal, QSize, QPoint, QItemSelectionModel
 from PyQt6.QtGui import QColor, QBrush, QFont, QAction, QIcon
 
+logger = logging.getLogger(__name__)
+
 
 class FitListItem(QListWidgetItem):
     """拟合项目列表项"""
@@ -44,7 +48,7 @@ class FitListItem(QListWidgetItem):
         self.setToolTip(tooltip)
         
         # 显示置置一些调试信息
-        print(f"Creating list item: {display_text}")
+        logger.debug("Creating list item: %s", display_text)
         
         # 存储额外数据
         self.setData(Qt.ItemDataRole.UserRole, {
@@ -159,7 +163,7 @@ class FitInfoPanel(QWidget):
         super(FitInfoPanel, self).__init__(parent)
         
         # 打印调试信息
-        print("Initializing FitInfoPanel")
+        logger.debug("Initializing FitInfoPanel")
         
         # 创建布局
         layout = QVBoxLayout(self)
@@ -218,11 +222,13 @@ class FitInfoPanel(QWidget):
         layout.addWidget(self.fit_list, 1)  # 给列表分配最大权重
         
         # 操作按钮区域 - 使用更紧凑的布局，但给按钮更高的高度
-        button_layout = QHBoxLayout()
+        # 按钮放在单独的容器中，样式表只作用于这两个按钮（设置在面板上会影响从面板打开的编辑对话框）
+        button_container = QWidget()
+        button_layout = QHBoxLayout(button_container)
         button_layout.setSpacing(6)
         button_layout.setContentsMargins(0, 8, 0, 8)  # 适当的上下边距
         
-        # 更高的按钮样式 - 改善字体颜色对比度
+        # 更高的按钮样式 - 改善字体颜色对比度（设置在按钮容器上，两个按钮共用一次解析的样式表）
         button_style = """
             QPushButton {
                 font-size: 10px;
@@ -249,23 +255,23 @@ class FitInfoPanel(QWidget):
             }
         """
         
+        button_container.setStyleSheet(button_style)
+        
         # 删除选中项按钮 - 更高
         self.delete_selected_btn = QPushButton("Delete Selected")
         self.delete_selected_btn.setToolTip("Delete selected fit(s)")
         self.delete_selected_btn.setEnabled(False)  # 初始禁用
-        self.delete_selected_btn.setStyleSheet(button_style)
         
         # 切换拟合标签可见性按钮 - 更高
         self.toggle_labels_btn = QPushButton("Hide Labels")
         self.toggle_labels_btn.setToolTip("Hide/Show fit labels in the plot")
         self.toggle_labels_btn.setCheckable(True)
-        self.toggle_labels_btn.setStyleSheet(button_style)
         
         # 添加按钮到布局
         button_layout.addWidget(self.delete_selected_btn)
         button_layout.addWidget(self.toggle_labels_btn)
         
-        layout.addLayout(button_layout, 0)  # 不给按钮区域分配伸缩权重，保持固定高度，不挤压列表
+        layout.addWidget(button_container, 0)  # 不给按钮区域分配伸缩权重，保持固定高度，不挤压列表
         
         # 统计信息区域 - 设置合适的固定高度，不让它占用过多空间
         self.stats_group = QGroupBox("Statistics")
@@ -293,7 +299,7 @@ class FitInfoPanel(QWidget):
         self.stats_group.show()
         
         # 打印调试信息
-        print("Connecting signals in FitInfoPanel")
+        logger.debug("Connecting signals in FitInfoPanel")
         
         # 连接信号
         self.fit_list.itemSelectionChanged.connect(self.on_selection_changed)
@@ -304,7 +310,7 @@ class FitInfoPanel(QWidget):
         self.toggle_labels_btn.clicked.connect(self.on_toggle_labels)
         
         # 打印调试信息
-        print("FitInfoPanel initialized")
+        logger.debug("FitInfoPanel initialized")
     
     def add_fit(self, fit_index, amp, mu, sigma, x_range, color):
         """添加拟合项目到列表"""
@@ -324,8 +330,8 @@ class FitInfoPanel(QWidget):
             self.stats_label.setText("No fits selected. All curves have the same thickness.")
         
         # 打印调试信息
-        print(f"Added fit to panel: {fit_index}, {amp:.2f}, {mu:.4f}, {sigma:.4f}, FWHM={fwhm:.4f}")
-        print(f"Current fit count: {self.fit_list.count()}")
+        logger.debug("Added fit to panel: %s, %.2f, %.4f, %.4f, FWHM=%.4f", fit_index, amp, mu, sigma, fwhm)
+        logger.debug("Current fit count: %s", self.fit_list.count())
     
     def update_fit(self, fit_index, amp, mu, sigma, x_range, color):
         """更新拟合项目"""
@@ -386,16 +392,16 @@ class FitInfoPanel(QWidget):
                     # 保持列表和统计区域可见，不隐藏
                     self.stats_label.setText("Select a fit to view its details")
                 
-                print(f"Removed fit {fit_index} from panel")
+                logger.debug("Removed fit %s from panel", fit_index)
                 return True
         
-        print(f"Could not find fit {fit_index} to remove from panel")
+        logger.debug("Could not find fit %s to remove from panel", fit_index)
         return False
     
     def clear_all_fits(self):
         """清除所有拟合项目 - 增强版"""
-        print("[FitInfoPanel] Clearing all fits from panel")
-        print(f"[FitInfoPanel] Current fit count before clear: {self.fit_list.count()}")
+        logger.debug("[FitInfoPanel] Clearing all fits from panel")
+        logger.debug("[FitInfoPanel] Current fit count before clear: %s", self.fit_list.count())
         
         # 清空列表
         self.fit_list.clear()
@@ -409,8 +415,8 @@ class FitInfoPanel(QWidget):
         # 取消任何高亮状态，发送-1表示没有选中任何拟合
         self.fit_selected.emit(-1)
         
-        print(f"[FitInfoPanel] Fit count after clear: {self.fit_list.count()}")
-        print("[FitInfoPanel] All fits cleared from panel")
+        logger.debug("[FitInfoPanel] Fit count after clear: %s", self.fit_list.count())
+        logger.debug("[FitInfoPanel] All fits cleared from panel")
     
     def on_selection_changed(self):
         """处理选择变化"""
@@ -5,12 +5,16 @@ Fitting Manager - 拟合管理器
 负责管理高斯拟合功能
 """
 
+import logging
+
 import numpy as np
 from matplotlib.widgets import RectangleSelector
 from scipy.optimize import curve_fit
 from PyQt6.QtCore import QTimer, QObject, pyqtSignal
 from .plot_utils import ColorManager, DataHasher
 
+logger = logging.getLogger(__name__)
+
 
 class FitDataManager:
     """拟合数据管理器，用于在不同的视图之间同步拟合结果"""
@@ -20,6 +24,7 @@ class FitDataManager:
         self.fit_regions = []
         self.data_range = None
         self.data_hash = None
+        self.version = 0  # 每次保存/清除时递增，视图据此判断显示的拟合是否最新
     
     def save_fits(self, fits, regions, data_range=None, data_hash=None):
         """保存拟合结果"""
@@ -27,7 +32,8 @@ class FitDataManager:
         self.fit_regions = [(r[0], r[1]) for r in regions if len(r) >= 2] if regions else []
         self.data_range = data_range
         self.data_hash = data_hash
-        print(f"Saved {len(self.gaussian_fits)} fits")
+        self.version += 1
+        logger.debug("Saved %s fits", len(self.gaussian_fits))
     
     def get_fits(self):
         """获取拟合结果"""
@@ -36,17 +42,18 @@ class FitDataManager:
     def has_fits(self):
         """检查是否有拟合结果"""
         has_fits = len(self.gaussian_fits) > 0
-        print(f"[FitDataManager] has_fits() = {has_fits}, fit count = {len(self.gaussian_fits)}")
+        logger.debug("[FitDataManager] has_fits() = %s, fit count = %s", has_fits, len(self.gaussian_fits))
         return has_fits
     
     def clear_fits(self):
         """清除所有拟合结果"""
-        print(f"[FitDataManager] Clearing {len(self.gaussian_fits)} fits")
+        logger.debug("[FitDataManager] Clearing %s fits", len(self.gaussian_fits))
         self.gaussian_fits.clear()
         self.fit_regions.clear()
         self.data_range = None
         self.data_hash = None
-        print("[FitDataManager] All fits cleared")
+        self.version += 1
+        logger.debug("[FitDataManager] All fits cleared")
     
     def is_compatible_with_data(self, data_range, data_hash):
         """检查拟合结果是否与当前数据兼容"""
@@ -89,9 +96,14 @@ class FittingManager(QObject):
         
         # 拟合数据管理器
         self.shared_fit_data = None
+        # 当前图表上显示的共享拟合数据版本
+        self._displayed_fit_version = None
     
     def setup_for_histogram_mode(self):
         """为直方图模式设置拟合功能"""
+        # 直方图已重新绘制，之前的拟合曲线不再显示
+        self._displayed_fit_version = None
+        
         if not hasattr(self.plot_canvas, 'ax'):
             return
             
@@ -111,7 +123,7 @@ class FittingManager(QObject):
     def set_shared_fit_data(self, shared_fit_data):
         """设置共享的拟合数据引用"""
         self.shared_fit_data = shared_fit_data
-        print(f"Set shared fit data: {shared_fit_data}")
+        logger.debug("Set shared fit data: %s", shared_fit_data)
     
     def on_rect_select(self, eclick, erelease):
         """处理矩形选择器的框选区域"""
@@ -122,10 +134,8 @@ class FittingManager(QObject):
             self.pending_rect_coords = (x_min, x_max)
             self.rect_select_timer.start()
             
-        except Exception as e:
-            print(f"Error in rectangle selector: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in rectangle selector")
     
     def _delayed_rect_select(self):
         """延迟处理框选区域"""
@@ -156,7 +166,7 @@ class FittingManager(QObject):
         try:
             # 获取直方图数据
             if not hasattr(self.plot_canvas, 'histogram_data'):
-                print("No histogram data available for fitting")
+                logger.warning("No histogram data available for fitting")
                 return
                 
             # 获取数据在选择区域内的部分
@@ -164,12 +174,12 @@ class FittingManager(QObject):
             selected_data = self.plot_canvas.histogram_data[mask]
             
             if len(selected_data) < 10:
-                print("Not enough data points for Gaussian fitting")
+                logger.warning("Not enough data points for Gaussian fitting")
                 return
             
             # 获取直方图bin信息
             if not hasattr(self.plot_canvas, 'hist_bin_centers'):
-                print("No histogram bin centers available")
+                logger.warning("No histogram bin centers available")
                 return
                 
             bin_mask = (self.plot_canvas.hist_bin_centers >= x_min) & (self.plot_canvas.hist_bin_centers <= x_max)
@@ -177,7 +187,7 @@ class FittingManager(QObject):
             y_data = self.plot_canvas.hist_counts[bin_mask]
             
             if len(x_data) < 3:
-                print("Not enough histogram bins for Gaussian fitting")
+                logger.warning("Not enough histogram bins for Gaussian fitting")
                 return
             
             # 高斯函数
@@ -197,7 +207,7 @@ class FittingManager(QObject):
             
             p0 = [amp_init, mean_init, std_init]
             
-            # 拟合高斯函数
+            # 拟合高斯函数（curve_fit内部将x/y转换为float64，float32的通道数据不影响拟合精度）
             try:
                 popt, _ = curve_fit(gaussian, x_data, y_data, p0=p0, bounds=bounds, maxfev=2000)
                 
@@ -254,10 +264,8 @@ class FittingManager(QObject):
             except RuntimeError as e:
                 print(f"Error fitting Gaussian: {e}")
                 
-        except Exception as e:
-            print(f"Error in Gaussian fitting: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error in Gaussian fitting")
     
     def clear_fits(self):
         """清除所有高斯拟合"""
@@ -319,67 +327,36 @@ class FittingManager(QObject):
             # 重绘
             self.plot_canvas.draw()
             
-        except Exception as e:
-            print(f"Error clearing fits: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error clearing fits")
     
     def delete_specific_fit(self, fit_index):
         """删除特定的拟合"""
+        if self.gaussian_fits and not 1 <= fit_index <= len(self.gaussian_fits):
+            logger.warning("Invalid fit index %s, valid range: 1-%s", fit_index, len(self.gaussian_fits))
+            return False
+        return self.delete_fits([fit_index])
+    
+    def delete_fits(self, fit_indices):
+        """批量删除拟合（fit_index从1开始），面板更新、同步和重绘只做一次"""
         try:
             if not self.gaussian_fits:
-                print("No fits to delete")
+                logger.debug("No fits to delete")
                 return False
             
-            # 直接使用索引匹配（fit_index从1开始，数组索引从0开始）
-            target_index = fit_index - 1
-            
-            # 检查索引是否有效
-            if target_index < 0 or target_index >= len(self.gaussian_fits):
-                print(f"Invalid fit index {fit_index}, valid range: 1-{len(self.gaussian_fits)}")
+            # 数组索引从0开始
+            target_indices = {i - 1 for i in fit_indices if 1 <= i <= len(self.gaussian_fits)}
+            if not target_indices:
+                logger.warning("Invalid fit indices %s, valid range: 1-%s", list(fit_indices), len(self.gaussian_fits))
                 return False
             
-            fit = self.gaussian_fits[target_index]
-            print(f"Deleting fit {fit_index} (array index {target_index})")
+            for target_index in sorted(target_indices):
+                logger.debug("Deleting fit %s (array index %s)", target_index + 1, target_index)
+                self._remove_fit_artists(target_index)
             
-            # 安全从图中移除元素
-            if 'line' in fit and fit['line']:
-                try:
-                    if fit['line'] in self.plot_canvas.ax.lines:
-                        fit['line'].remove()
-                except Exception as e:
-                    print(f"Error removing line: {e}")
-                    try:
-                        fit['line'].set_visible(False)
-                    except:
-                        pass
-            
-            if 'text' in fit and fit['text']:
-                try:
-                    if hasattr(self.plot_canvas.ax, 'texts') and fit['text'] in self.plot_canvas.ax.texts:
-                        fit['text'].remove()
-                    else:
-                        fit['text'].set_visible(False)
-                except Exception as e:
-                    print(f"Error removing text: {e}")
-                    try:
-                        fit['text'].set_visible(False)
-                    except Exception as e2:
-                        print(f"Error hiding text: {e2}")
-                        pass
-            
-            # 移除相关的区域高亮
-            if target_index < len(self.fit_regions):
-                try:
-                    _, _, region = self.fit_regions[target_index]
-                    if region and hasattr(self.plot_canvas.ax, 'patches') and region in self.plot_canvas.ax.patches:
-                        region.remove()
-                except Exception as e:
-                    print(f"Error removing region: {e}")
-                self.fit_regions.pop(target_index)
-            
-            # 从列表中移除
-            self.gaussian_fits.pop(target_index)
+            # 一次遍历保留未删除的拟合和区域（原地替换内容，不逐个pop）
+            self.gaussian_fits[:] = [fit for i, fit in enumerate(self.gaussian_fits) if i not in target_indices]
+            self.fit_regions[:] = [region for i, region in enumerate(self.fit_regions) if i not in target_indices]
             
             # 重新编号剩余的拟合并更新拟合信息面板
             self._renumber_fits_and_update_panel()
@@ -392,7 +369,7 @@ class FittingManager(QObject):
             if len(self.gaussian_fits) == 0:
                 if self.shared_fit_data is not None:
                     self.shared_fit_data.clear_fits()
-                    print("Cleared shared fit data after deleting last fit")
+                    logger.debug("Cleared shared fit data after deleting last fit")
             else:
                 self.save_current_fits()
             
@@ -402,15 +379,52 @@ class FittingManager(QObject):
             # 重新绘制
             self.plot_canvas.draw()
             
-            print(f"Successfully deleted fit {fit_index}, {len(self.gaussian_fits)} fits remaining")
+            logger.debug("Successfully deleted %s fits, %s fits remaining", len(target_indices), len(self.gaussian_fits))
             return True
             
-        except Exception as e:
-            print(f"Error deleting specific fit: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error deleting fits")
             return False
     
+    def _remove_fit_artists(self, target_index):
+        """从图中移除指定拟合的曲线、标签和区域高亮（不重绘，也不修改拟合和区域列表）"""
+        fit = self.gaussian_fits[target_index]
+        
+        # 安全从图中移除元素
+        if 'line' in fit and fit['line']:
+            try:
+                if fit['line'] in self.plot_canvas.ax.lines:
+                    fit['line'].remove()
+            except Exception as e:
+                print(f"Error removing line: {e}")
+                try:
+                    fit['line'].set_visible(False)
+                except:
+                    pass
+        
+        if 'text' in fit and fit['text']:
+            try:
+                if hasattr(self.plot_canvas.ax, 'texts') and fit['text'] in self.plot_canvas.ax.texts:
+                    fit['text'].remove()
+                else:
+                    fit['text'].set_visible(False)
+            except Exception as e:
+                print(f"Error removing text: {e}")
+                try:
+                    fit['text'].set_visible(False)
+                except Exception as e2:
+                    print(f"Error hiding text: {e2}")
+                    pass
+        
+        # 移除相关的区域高亮
+        if target_index < len(self.fit_regions):
+            try:
+                _, _, region = self.fit_regions[target_index]
+                if region and hasattr(self.plot_canvas.ax, 'patches') and region in self.plot_canvas.ax.patches:
+                    region.remove()
+            except Exception as e:
+                print(f"Error removing region: {e}")
+    
     def _renumber_fits(self):
         """重新编号拟合"""
         for i, fit in enumerate(self.gaussian_fits):
@@ -430,7 +444,7 @@ class FittingManager(QObject):
     
     def _renumber_fits_and_update_panel(self):
         """重新编号拟合并更新信息面板"""
-        print(f"Renumbering {len(self.gaussian_fits)} remaining fits and updating panel")
+        logger.debug("Renumbering %s remaining fits and updating panel", len(self.gaussian_fits))
         
         # 首先清空拟合信息面板
         if (hasattr(self.plot_canvas, 'parent_dialog') and 
@@ -438,7 +452,7 @@ class FittingManager(QObject):
             hasattr(self.plot_canvas.parent_dialog, 'fit_info_panel')):
             
             self.plot_canvas.parent_dialog.fit_info_panel.clear_all_fits()
-            print("Cleared fit info panel")
+            logger.debug("Cleared fit info panel")
         
         # 重新编号并重新添加所有拟合到信息面板
         for i, fit in enumerate(self.gaussian_fits):
@@ -467,11 +481,11 @@ class FittingManager(QObject):
                 self.plot_canvas.parent_dialog.fit_info_panel.add_fit(
                     fit_num, amp, mu, sigma, x_range, color
                 )
-                print(f"Re-added fit {fit_num} to panel")
+                logger.debug("Re-added fit %s to panel", fit_num)
         
         # 更新拟合信息字符串
         self.update_fit_info_string()
-        print("Renumbering and panel update completed")
+        logger.debug("Renumbering and panel update completed")
     
     def update_fit_info_string(self):
         """更新拟合信息字符串"""
@@ -516,12 +530,11 @@ class FittingManager(QObject):
             # 保存到共享数据
             if self.shared_fit_data is not None:
                 self.shared_fit_data.save_fits(current_fits, current_regions, data_range, data_hash)
-                print(f"Saved {len(current_fits)} fits to shared data")
+                self._displayed_fit_version = self.shared_fit_data.version
+                logger.debug("Saved %s fits to shared data", len(current_fits))
                 
-        except Exception as e:
-            print(f"Error saving fits: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error saving fits")
     
     def immediate_sync_to_main_view(self):
         """立即同步拟合结果到主视图的subplot3"""
@@ -536,53 +549,54 @@ class FittingManager(QObject):
                     main_canvas._ax3_fit_lines = []
                 
                 if hasattr(main_canvas, 'update_highlighted_plots'):
-                    print(f"Triggering sync to main view - current fits: {len(self.gaussian_fits)}")
+                    logger.debug("Triggering sync to main view - current fits: %s", len(self.gaussian_fits))
                     main_canvas.update_highlighted_plots()
                     main_canvas.draw()
-                    print(f"Immediate sync to main view subplot3 completed")
-        except Exception as e:
-            print(f"Error in immediate sync to main view: {e}")
-            import traceback
-            traceback.print_exc()
+                    logger.debug("Immediate sync to main view subplot3 completed")
+        except Exception:
+            logger.exception("Error in immediate sync to main view")
+    
+    def shared_fits_displayed(self):
+        """共享拟合数据自上次保存/恢复以来未变化且仍显示在当前图表上"""
+        return self.shared_fit_data is not None and self._displayed_fit_version == self.shared_fit_data.version
     
     def restore_fits_from_shared_data(self):
         """从共享数据恢复拟合结果"""
         if self.shared_fit_data is None or not self.shared_fit_data.has_fits():
-            print("[Restore] No shared fit data to restore")
+            logger.debug("[Restore] No shared fit data to restore")
             return False
             
         try:
             # 检查数据兼容性（放宽检查条件）
             data_hash = self._calculate_data_hash()
             if data_hash is None:
-                print("[Restore] Cannot calculate data hash for compatibility check")
+                logger.debug("[Restore] Cannot calculate data hash for compatibility check")
                 # 放宽检查，允许恢复
             
             # 获取共享的拟合数据
             fits, regions = self.shared_fit_data.get_fits()
             
             if not fits:
-                print("[Restore] No fits found in shared data")
+                logger.debug("[Restore] No fits found in shared data")
                 return False
             
-            print(f"[Restore] Restoring {len(fits)} fits from shared data")
+            logger.debug("[Restore] Restoring %s fits from shared data", len(fits))
             
             # 应用到当前图表
             self.apply_fits_to_plot(fits, regions)
+            self._displayed_fit_version = self.shared_fit_data.version
             
-            print(f"[Restore] Successfully restored {len(fits)} fits from shared data")
+            logger.debug("[Restore] Successfully restored %s fits from shared data", len(fits))
             return True
             
-        except Exception as e:
-            print(f"[Restore] Error restoring fits from shared data: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("[Restore] Error restoring fits from shared data")
             return False
     
     def apply_fits_to_plot(self, fits, regions):
         """将拟合结果应用到当前图表"""
         try:
-            print(f"[Restore] Applying {len(fits)} fits to plot")
+            logger.debug("[Restore] Applying %s fits to plot", len(fits))
             
             # 清除现有的拟合
             self._clear_existing_fits()
@@ -594,14 +608,14 @@ class FittingManager(QObject):
             # 应用每个拟合
             for i, fit_data in enumerate(fits):
                 if not fit_data or 'popt' not in fit_data:
-                    print(f"[Restore] Skipping invalid fit data at index {i}")
+                    logger.debug("[Restore] Skipping invalid fit data at index %s", i)
                     continue
                     
                 popt = fit_data['popt']
                 x_range = fit_data['x_range']
                 color = fit_data['color']
                 
-                print(f"[Restore] Drawing fit {i+1}: mu={popt[1]:.3f}, sigma={popt[2]:.3f}, color={color}")
+                logger.debug("[Restore] Drawing fit %s: mu=%.3f, sigma=%.3f, color=%s", i+1, popt[1], popt[2], color)
                 # 绘制拟合曲线
                 self._draw_fit_curve(popt, x_range, color, i + 1)
                 
@@ -610,7 +624,7 @@ class FittingManager(QObject):
                 self.plot_canvas.parent_dialog and 
                 hasattr(self.plot_canvas.parent_dialog, 'fit_info_panel')):
                 
-                print(f"[Restore] Updating fit info panel with {len(fits)} fits")
+                logger.debug("[Restore] Updating fit info panel with %s fits", len(fits))
                 self.plot_canvas.parent_dialog.fit_info_panel.clear_all_fits()
                 for i, fit_data in enumerate(fits):
                     if fit_data and 'popt' in fit_data:
@@ -618,18 +632,16 @@ class FittingManager(QObject):
                         self.plot_canvas.parent_dialog.fit_info_panel.add_fit(
                             i + 1, amp, mu, sigma, fit_data['x_range'], fit_data['color']
                         )
-                        print(f"[Restore] Added fit {i+1} to info panel")
+                        logger.debug("[Restore] Added fit %s to info panel", i+1)
             else:
-                print("[Restore] fit_info_panel not available for update")
+                logger.debug("[Restore] fit_info_panel not available for update")
             
             # 更新拟合信息字符串
             self.update_fit_info_string()
-            print(f"[Restore] Updated fit info string")
+            logger.debug("[Restore] Updated fit info string")
                 
-        except Exception as e:
-            print(f"[Restore] Error applying fits to plot: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("[Restore] Error applying fits to plot")
     
     def _draw_fit_curve(self, popt, x_range, color, fit_num):
         """绘制单个拟合曲线"""
@@ -670,10 +682,8 @@ class FittingManager(QObject):
             region = self.plot_canvas.ax.axvspan(x_range[0], x_range[1], alpha=0.08, color='green', zorder=0)
             self.fit_regions.append((x_range[0], x_range[1], region))
                 
-        except Exception as e:
-            print(f"Error drawing fit curve: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error drawing fit curve")
     
     def _clear_existing_fits(self):
         """清除现有的拟合绘图对象"""
@@ -716,13 +726,13 @@ class FittingManager(QObject):
                         except:
                             pass
                         
-        except Exception as e:
-            print(f"Error clearing existing fits: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error clearing existing fits")
     
     def _calculate_data_hash(self):
         """计算数据哈希值用于检测数据变化"""
+        if hasattr(self.plot_canvas, '_calculate_data_hash'):
+            return self.plot_canvas._calculate_data_hash()
         if hasattr(self.plot_canvas, 'histogram_data') and self.plot_canvas.histogram_data is not None:
             return DataHasher.calculate_data_hash(self.plot_canvas.histogram_data)
         return None
@@ -748,7 +758,7 @@ class FittingManager(QObject):
             
             # 检查索引是否有效
             if target_index < 0 or target_index >= len(self.gaussian_fits):
-                print(f"Invalid fit index {fit_index}, valid range: 1-{len(self.gaussian_fits)}")
+                logger.warning("Invalid fit index %s, valid range: 1-%s", fit_index, len(self.gaussian_fits))
                 self.plot_canvas.draw()
                 return
             
@@ -758,19 +768,17 @@ class FittingManager(QObject):
             if 'line' in target_fit and target_fit['line']:
                 try:
                     target_fit['line'].set_linewidth(3.0)  # 加粗显示
-                    print(f"Highlighted fit {fit_index} (index {target_index}) with bold line")
+                    logger.debug("Highlighted fit %s (index %s) with bold line", fit_index, target_index)
                 except Exception as e:
                     print(f"Error highlighting fit line: {e}")
             else:
-                print(f"No line found for fit {fit_index}")
+                logger.debug("No line found for fit %s", fit_index)
             
             # 重绘图表
             self.plot_canvas.draw()
             
-        except Exception as e:
-            print(f"Error highlighting fit {fit_index}: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error highlighting fit %s", fit_index)
     
     def toggle_fit_labels(self, visible):
         """切换拟合标签可见性"""
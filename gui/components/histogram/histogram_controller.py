@@ -5,13 +5,25 @@ Histogram Controller - 直方图控制器
 负责协调模型（数据管理器）和视图（对话框）之间的交互
 """
 
-import os
+import logging
+
 import numpy as np
+from PyQt6.QtCore import QSignalBlocker
 from .error_handler import ErrorHandler
+from .plot_utils import RangeExtrema
+
+logger = logging.getLogger(__name__)
+
+# 状态栏文件信息摘要中不显示的字段
+_INFO_EXCLUDE = frozenset({'File Path', 'Modified Time'})
+
 
 class HistogramController:
     """直方图控制器，负责协调模型和视图"""
     
+    # 箱边界缓存的最大条目数
+    _EDGE_CACHE_SIZE = 64
+    
     def __init__(self, data_manager, view):
         """初始化控制器
         
@@ -29,43 +41,37 @@ class HistogramController:
         self._cursor_update_timer.timeout.connect(self._delayed_cursor_update)
         self._pending_cursor_updates = {}  # {cursor_id: position}
         
+        # 性能优化：拖动高亮滑块时合并subplot3直方图重算
+        self._subplot3_timer = QTimer()
+        self._subplot3_timer.setSingleShot(True)
+        self._subplot3_timer.setInterval(40)
+        self._subplot3_timer.timeout.connect(self._delayed_subplot3_update)
+        
+        # 取反高亮数据的复用缓冲区，避免拖动滑块时反复分配内存
+        self._neg_buf = None
+        
+        # 最近一次完整绘制subplot3直方图时的输入，用于判断能否只更新坐标轴
+        self._hist_cache_key = None
+        # subplot3当前显示的(log_x, log_y, show_kde)，与输入一起判断subplot3是否已是最新
+        self._subplot3_display = None
+        # 主视图每次重新绘制数据时递增，作为数据版本号
+        self._data_generation = 0
+        # subplot3直方图输入 -> 箱边界，高亮区域来回拖动或强制重绘时省去最值扫描
+        self._edge_cache = {}
+        # 当前通道的分块最值索引，箱边界未缓存时用于快速得到高亮区域的最值
+        self._range_extrema = None
+        
         # 连接视图的信号到控制器的方法
         self._connect_signals()
     
     def _connect_signals(self):
-        """连接视图的信号"""
-        # 文件加载
-        self.view.file_channel_control.load_file_btn.clicked.connect(self.load_file)
-        
-        # 通道选择
-        self.view.file_channel_control.channel_changed.connect(self.on_channel_changed)
+        """连接视图的信号
         
-        # 采样率变化
-        self.view.file_channel_control.sampling_rate_changed.connect(self.on_sampling_rate_changed)
-        
-        # 直方图控制信号
-        self.view.histogram_control.bins_changed.connect(self.on_bins_changed)
-        self.view.histogram_control.highlight_size_changed.connect(self.on_highlight_size_changed)
-        self.view.histogram_control.highlight_position_changed.connect(self.on_highlight_position_changed)
-        self.view.histogram_control.log_x_changed.connect(self.on_log_x_changed)
-        self.view.histogram_control.log_y_changed.connect(self.on_log_y_changed)
-        self.view.histogram_control.kde_changed.connect(self.on_kde_changed)
-        self.view.histogram_control.invert_data_changed.connect(self.on_invert_data_changed)
-        self.view.histogram_control.clear_fits_requested.connect(self.on_clear_fits_requested)
-        
-        # Cursor相关信号 - 新增：连接cursor位置更新信号
-        if hasattr(self.view, 'plot_canvas') and hasattr(self.view.plot_canvas, 'cursor_position_updated'):
-            self.view.plot_canvas.cursor_position_updated.connect(self.on_cursor_position_updated)
-        if hasattr(self.view, 'subplot3_canvas') and hasattr(self.view.subplot3_canvas, 'cursor_position_updated'):
-            self.view.subplot3_canvas.cursor_position_updated.connect(self.on_cursor_position_updated)
-        
-        # 连接拟合信息面板的信号
-        if hasattr(self.view, 'fit_info_panel'):
-            # 注意：这些信号已经在signal_connector.py中连接了，所以这里不再重复连接
-            # 避免重复连接导致信号被触发多次
-            pass
-        
-        # 暗色模式和导出功能
+        文件、直方图控制、cursor及拟合面板信号统一由HistogramSignalConnector
+        连接到对话框（对话框再委托给控制器），这里不再重复连接，
+        避免同一次操作触发两次加载/重绘
+        """
+        # 暗色模式和导出功能（信号连接器未处理）
         if hasattr(self.view.histogram_control, 'dark_mode_changed'):
             self.view.histogram_control.dark_mode_changed.connect(self.on_dark_mode_changed)
         
@@ -91,31 +97,34 @@ class HistogramController:
                 )
                 return
             
-            # 更新文件标签
-            self.view.file_channel_control.update_file_info(self.data_manager.file_path)
-            
-            # 更新采样率
-            self.view.file_channel_control.set_sampling_rate(self.data_manager.sampling_rate)
-            
-            # 更新通道列表
+            # 批量更新控件，屏蔽回调避免在显式绘图前触发多余重绘
             channels = self.data_manager.get_channels()
-            self.view.file_channel_control.update_channels(channels)
+            with QSignalBlocker(self.view.file_channel_control):
+                # 更新文件标签
+                self.view.file_channel_control.update_file_info(self.data_manager.file_path)
+                
+                # 更新采样率
+                self.view.file_channel_control.set_sampling_rate(self.data_manager.sampling_rate)
+                
+                # 更新通道列表
+                self.view.file_channel_control.update_channels(channels)
+                
+                # 选择第一个通道
+                if channels:
+                    self.view.file_channel_control.set_selected_channel(channels[0])
             
-            # 选择第一个通道
             if channels:
                 self.data_manager.selected_channel = channels[0]
-                self.view.file_channel_control.set_selected_channel(channels[0])
                 
                 # 获取通道数据并绘制
                 self._update_plot(channels[0])
             
             # 文件信息摘要
             if isinstance(info, dict):
-                summary = ", ".join([f"{k}: {v}" for k, v in info.items() 
-                                if k not in ['File Path', 'Modified Time']])
-                self.view.status_bar.showMessage(f"Loaded file: {os.path.basename(self.data_manager.file_path)} - {summary}")
+                summary = ", ".join(f"{k}: {v}" for k, v in info.items() if k not in _INFO_EXCLUDE)
+                self.view.status_bar.showMessage(f"Loaded file: {self.data_manager.file_name} - {summary}")
             else:
-                self.view.status_bar.showMessage(f"Loaded file: {os.path.basename(self.data_manager.file_path)}")
+                self.view.status_bar.showMessage(f"Loaded file: {self.data_manager.file_name}")
             
         except Exception as e:
             ErrorHandler.handle_error(
@@ -131,34 +140,29 @@ class HistogramController:
             # 获取通道数据
             channel_data = self.data_manager.get_channel_data(channel_name)
             
+            # 通道变化时释放取反缓冲区、箱边界缓存和最值索引
+            self._neg_buf = None
+            self._edge_cache.clear()
+            self._range_extrema = None
+            
             if channel_data is None:
                 self.view.status_bar.showMessage(f"Error: No data for channel {channel_name}")
                 return
             
             # 获取文件名作为标题
-            file_name = os.path.basename(self.data_manager.file_path) if self.data_manager.file_path else ""
-            
-            # 获取当前显示设置
-            bins = self.view.histogram_control.get_bins()
-            log_x = self.view.histogram_control.log_x_check.isChecked()
-            log_y = self.view.histogram_control.log_y_check.isChecked()
-            show_kde = self.view.histogram_control.kde_check.isChecked()
-            invert_data = self.view.histogram_control.invert_data_check.isChecked()
+            file_name = self.data_manager.file_name
             
-            # 绘制数据
+            # 绘制数据（使用当前显示设置）
             self.view.plot_canvas.plot_data(
                 channel_data, 
                 self.data_manager.sampling_rate,
-                bins,
-                log_x=log_x,
-                log_y=log_y,
-                show_kde=show_kde,
-                invert_data=invert_data,
-                file_name=file_name
+                file_name=file_name,
+                **self.view.histogram_control.get_plot_kwargs()
             )
+            self._data_generation += 1
             
-            # 更新统计信息
-            self._update_statistics(channel_data)
+            # 通道/采样率变化后刷新subplot3直方图
+            self._schedule_subplot3_update()
             
             if channel_name:
                 self.view.status_bar.showMessage(f"Selected channel: {channel_name}")
@@ -171,44 +175,49 @@ class HistogramController:
                 status_bar=self.view.status_bar
             )
     
-    def _update_statistics(self, data):
-        """更新数据统计信息"""
-        if data is None or len(data) == 0:
-            return
-            
-        # 计算基本统计量
-        try:
-            stats_info = {
-                "Count": len(data),
-                "Min": np.min(data),
-                "Max": np.max(data),
-                "Mean": np.mean(data),
-                "Median": np.median(data),
-                "Std Dev": np.std(data)
-            }
-            
-            # 更新统计信息显示
-            if hasattr(self.view, 'update_statistics_display'):
-                self.view.update_statistics_display(stats_info)
-            
-        except Exception as e:
-            print(f"Error calculating statistics: {e}")
-    
-    def _update_highlighted_statistics(self):
-        """更新高亮区域的统计信息"""
+    def _current_highlight_view(self):
+        """获取当前高亮区域的数据（已应用取反设置），无数据时返回None"""
         if not hasattr(self.view.plot_canvas, 'data') or self.view.plot_canvas.data is None:
-            return
+            return None
             
         # 获取高亮区域数据
         highlight_min = self.view.plot_canvas.highlight_min
         highlight_max = self.view.plot_canvas.highlight_max
         data = self.view.plot_canvas.data
         
-        # 应用数据取反设置
-        highlighted_data = -data[highlight_min:highlight_max] if self.view.plot_canvas.invert_data else data[highlight_min:highlight_max]
+        highlighted_data = data[highlight_min:highlight_max]
+        if not self.view.plot_canvas.invert_data:
+            return highlighted_data
         
-        # 更新统计信息
-        self._update_statistics(highlighted_data)
+        # 应用数据取反设置（写入复用的缓冲区，通道变化时重新分配）
+        if self._neg_buf is None or len(self._neg_buf) < len(data) or self._neg_buf.dtype != data.dtype:
+            self._neg_buf = np.empty(len(data), dtype=data.dtype)
+        view = self._neg_buf[:len(highlighted_data)]
+        np.negative(highlighted_data, out=view)
+        # 缓冲区会在下次更新时被覆盖，交给下游的视图设为只读；下游需要修改数据时须先复制（DataCleaner.clean_data插值前会复制）
+        view.flags.writeable = False
+        return view
+    
+    def _refresh_highlight_ui(self):
+        """高亮区域变化后清除拟合并刷新subplot3直方图"""
+        if getattr(self.view.plot_canvas, 'data', None) is None:
+            return
+        
+        # 清除拟合数据（因为高亮区域变化了）
+        self.view._clear_shared_fits_on_data_change()
+        
+        # 更新subplot3直方图（合并连续拖动事件）
+        self._schedule_subplot3_update()
+    
+    def _schedule_subplot3_update(self):
+        """subplot3可见时合并重算请求；不可见时由缓存键标记为过期，切换到直方图标签页时再重算"""
+        if self._subplot3_visible():
+            self._subplot3_timer.start()
+    
+    def _delayed_subplot3_update(self):
+        """滑块停顿后重算subplot3直方图（布局不变，跳过tight_layout）"""
+        if self._subplot3_visible():
+            self._update_subplot3_histogram(restore_fits=False, skip_layout=True)
     
     def on_channel_changed(self, channel_name):
         """处理通道选择变化"""
@@ -225,24 +234,13 @@ class HistogramController:
     def on_bins_changed(self, bins):
         """处理直方图箱数变化"""
         self.view.plot_canvas.update_bins(bins)
-        
-        # 如果当前有数据，更新统计信息
-        channel_data = self.data_manager.get_channel_data()
-        if channel_data is not None:
-            self._update_statistics(channel_data)
     
     def on_highlight_size_changed(self, size_percent):
         """处理高亮区域大小变化"""
         self.view.plot_canvas.update_highlight_size(size_percent)
         
-        # 更新高亮区域的统计信息
-        self._update_highlighted_statistics()
-        
-        # 清除拟合数据（因为高亮区域变化了）
-        self.view._clear_shared_fits_on_data_change()
-        
-        # 更新subplot3直方图
-        self._update_subplot3_histogram(restore_fits=False)
+        # 更新高亮区域统计信息和subplot3直方图
+        self._refresh_highlight_ui()
     
     def on_highlight_position_changed(self, position_percent):
         """处理高亮区域位置变化"""
@@ -253,40 +251,39 @@ class HistogramController:
             if hasattr(self.view.plot_canvas, 'update_highlight_position'):
                 self.view.plot_canvas.update_highlight_position(position_percent)
         
-        # 更新高亮区域的统计信息
-        self._update_highlighted_statistics()
-        
-        # 清除拟合数据（因为高亮区域变化了）
-        self.view._clear_shared_fits_on_data_change()
-        
-        # 更新subplot3直方图
-        self._update_subplot3_histogram(restore_fits=False)
+        # 更新高亮区域统计信息和subplot3直方图
+        self._refresh_highlight_ui()
     
     def on_log_x_changed(self, enabled):
         """处理X轴对数显示变化"""
         self.view.plot_canvas.set_log_x(enabled)
-        # 更新subplot3直方图
-        self._update_subplot3_histogram(restore_fits=False)
+        # 只更新subplot3坐标轴刻度（刻度标签宽度会变，需重新计算布局）
+        self._refresh_subplot3_axes()
         self.view.status_bar.showMessage(f"X-axis logarithmic scale: {'enabled' if enabled else 'disabled'}")
     
     def on_log_y_changed(self, enabled):
         """处理Y轴对数显示变化"""
         self.view.plot_canvas.set_log_y(enabled)
-        # 更新subplot3直方图
-        self._update_subplot3_histogram(restore_fits=False)
+        if enabled and not self.view.plot_canvas.log_y:
+            # 直方图含零计数无法使用对数刻度：直接取消勾选，避免经复选框信号再处理一遍
+            self.view.histogram_control.set_log_y_checked(False)
+            enabled = False
+        # 只更新subplot3坐标轴刻度（刻度标签宽度会变，需重新计算布局）
+        self._refresh_subplot3_axes()
         self.view.status_bar.showMessage(f"Y-axis logarithmic scale: {'enabled' if enabled else 'disabled'}")
     
     def on_kde_changed(self, enabled):
         """处理KDE曲线显示变化"""
         self.view.plot_canvas.set_kde(enabled)
-        # 更新subplot3直方图
-        self._update_subplot3_histogram(restore_fits=False)
+        # 只添加/移除subplot3的KDE曲线（布局不变，跳过tight_layout）
+        self._refresh_subplot3_axes(skip_layout=True)
         self.view.status_bar.showMessage(f"Kernel Density Estimation: {'enabled' if enabled else 'disabled'}")
     
     def on_invert_data_changed(self, enabled):
         """处理数据取反变化"""
         self.view.plot_canvas.set_invert_data(enabled)
-        # 注意：set_invert_data会完全重绘，所以不需要单独更新subplot3
+        # 注意：set_invert_data会完全重绘主视图，subplot3按需刷新
+        self._schedule_subplot3_update()
         self.view.status_bar.showMessage(f"Data inversion: {'enabled' if enabled else 'disabled'}")
     
     def on_dark_mode_changed(self, enabled):
@@ -330,44 +327,74 @@ class HistogramController:
                 status_bar=self.view.status_bar
             )
     
-    def _update_subplot3_histogram(self, restore_fits=False):
-        """更新subplot3直方图视图"""
+    def _update_subplot3_histogram(self, restore_fits=False, skip_layout=False, highlighted_data=None,
+                                   force=False):
+        """更新subplot3直方图视图
+        
+        Args:
+            restore_fits: 是否恢复拟合曲线
+            skip_layout: 是否跳过tight_layout（滑块拖动等布局不变的场景）
+            highlighted_data: 已切片/取反的高亮数据，为None时重新获取
+            force: 即使subplot3已是最新状态也重新绘制
+        """
         if not hasattr(self.view, 'subplot3_canvas') or self.view.subplot3_canvas is None:
             return
-            
-        if not hasattr(self.view.plot_canvas, 'data') or self.view.plot_canvas.data is None:
+        
+        # 获取当前显示设置（取反在高亮数据中处理）
+        options = self.view.histogram_control.get_plot_kwargs()
+        display = (options['log_x'], options['log_y'], options['show_kde'])
+        cache_key = self._subplot3_cache_key()
+        
+        # 自上次绘制以来数据和显示设置都没有变化（如来回切换标签页），无需重绘
+        if (not force and self._hist_cache_key is not None and
+                self._hist_cache_key == cache_key and
+                self._subplot3_display == display):
             return
         
+        self._hist_cache_key = None
+        self._subplot3_display = None
+        
         try:
             # 获取当前的高亮数据（从subplot3）
-            highlight_min = self.view.plot_canvas.highlight_min
-            highlight_max = self.view.plot_canvas.highlight_max
-            data = self.view.plot_canvas.data
-            
-            # 应用数据取反设置
-            highlighted_data = -data[highlight_min:highlight_max] if self.view.plot_canvas.invert_data else data[highlight_min:highlight_max]
+            if highlighted_data is None:
+                highlighted_data = self._current_highlight_view()
             
-            if len(highlighted_data) == 0:
+            if highlighted_data is None or len(highlighted_data) == 0:
                 return
             
-            # 获取当前显示设置
-            bins = self.view.histogram_control.get_bins()
-            log_x = self.view.histogram_control.log_x_check.isChecked()
-            log_y = self.view.histogram_control.log_y_check.isChecked()
-            show_kde = self.view.histogram_control.kde_check.isChecked()
-            
             # 获取文件名作为标题
-            file_name = os.path.basename(self.data_manager.file_path) if self.data_manager.file_path else ""
+            file_name = self.data_manager.file_name
+            
+            # 主视图ax3已对相同的高亮数据分箱时直接复用计数；否则相同输入已计算过箱边界时复用边界
+            counts = None
+            main_histogram = self.view.plot_canvas.get_highlight_histogram(options['bins'])
+            if main_histogram is not None:
+                counts, bin_edges = main_histogram
+            else:
+                bin_edges = self._edge_cache.get(cache_key)
+            data_range = self._highlight_range() if bin_edges is None else None
             
             # 在subplot3_canvas中创建直方图视图
-            self.view.subplot3_canvas.plot_subplot3_histogram(
+            used_edges = self.view.subplot3_canvas.plot_subplot3_histogram(
                 highlighted_data,
-                bins=bins,
-                log_x=log_x,
-                log_y=log_y,
-                show_kde=show_kde,
-                file_name=file_name
+                bins=options['bins'],
+                log_x=options['log_x'],
+                log_y=options['log_y'],
+                show_kde=options['show_kde'],
+                file_name=file_name,
+                skip_layout=skip_layout,
+                bin_edges=bin_edges,
+                data_range=data_range,
+                counts=counts,
+                data_key=self._highlight_data_key()
             )
+            self._hist_cache_key = cache_key
+            self._subplot3_display = display
+            
+            if bin_edges is None and used_edges is not None:
+                if len(self._edge_cache) >= self._EDGE_CACHE_SIZE:
+                    self._edge_cache.clear()
+                self._edge_cache[cache_key] = used_edges
             
         except Exception as e:
             ErrorHandler.handle_error(
@@ -377,21 +404,79 @@ class HistogramController:
                 status_bar=self.view.status_bar
             )
     
-    def on_tab_changed(self, index):
-        """处理标签页切换"""
-        if index == 1:  # 切换到直方图标签页
-            # 确保subplot3直方图是最新的，并且恢复拟合曲线
-            self._update_subplot3_histogram(restore_fits=True)
-            # 显示提示信息
-            self.view.status_bar.showMessage("Histogram view: Click and drag to select regions for Gaussian fitting")
+    def _highlight_range(self):
+        """用分块最值索引得到高亮区域数据（已应用取反）的(min, max)，无法得到时返回None"""
+        plot_canvas = self.view.plot_canvas
+        data = getattr(plot_canvas, 'data', None)
+        if data is None:
+            return None
+        
+        # 首次需要时才建立索引（只打开主视图时不必多扫描一遍数据）
+        if self._range_extrema is None or self._range_extrema.data is not data:
+            self._range_extrema = RangeExtrema(data)
+        
+        extrema = self._range_extrema.query(plot_canvas.highlight_min, plot_canvas.highlight_max)
+        if extrema is None:
+            return None
+        lo, hi = extrema
+        # 取反后的数据最值为原最值取反并交换
+        return (-hi, -lo) if plot_canvas.invert_data else (lo, hi)
+    
+    def _subplot3_visible(self):
+        """直方图标签页是否为当前标签页"""
+        return self.view.is_histogram_tab()
+    
+    def _subplot3_cache_key(self):
+        """subplot3直方图的输入（数据版本、高亮范围、箱数、取反），任一变化都需要重新计算直方图"""
+        data_key = self._highlight_data_key()
+        if data_key is None:
+            return None
+        return data_key + (self.view.histogram_control.get_plot_kwargs()['bins'],)
+    
+    def _highlight_data_key(self):
+        """高亮数据的精确输入（数据版本、高亮范围、取反），与箱数无关；没有数据时返回None"""
+        plot_canvas = self.view.plot_canvas
+        if getattr(plot_canvas, 'data', None) is None:
+            return None
+        return (self._data_generation, plot_canvas.highlight_min, plot_canvas.highlight_max,
+                plot_canvas.invert_data)
+    
+    def _created_subplot3_canvas(self):
+        """已创建的subplot3画布；尚未创建（直方图标签页从未打开）时返回None，其中没有需要同步的拟合"""
+        if hasattr(self.view, 'is_subplot3_canvas_created') and not self.view.is_subplot3_canvas_created():
+            return None
+        return getattr(self.view, 'subplot3_canvas', None)
+    
+    def _refresh_subplot3_axes(self, skip_layout=False):
+        """对数刻度/KDE变化时只更新subplot3的坐标轴，直方图输入变化时才完整重绘"""
+        # 不可见时推迟到切换标签页再重绘（先判断可见性，避免提前创建subplot3画布）
+        if not self._subplot3_visible():
+            return
+        subplot3_canvas = getattr(self.view, 'subplot3_canvas', None)
+        if subplot3_canvas is None:
+            return
+        
+        options = self.view.histogram_control.get_plot_kwargs()
+        if (self._hist_cache_key is not None and
+                self._hist_cache_key == self._subplot3_cache_key() and
+                subplot3_canvas.apply_subplot3_display_options(
+                    log_x=options['log_x'],
+                    log_y=options['log_y'],
+                    show_kde=options['show_kde'],
+                    skip_layout=skip_layout)):
+            self._subplot3_display = (options['log_x'], options['log_y'], options['show_kde'])
+            return
+        
+        self._update_subplot3_histogram(restore_fits=False, skip_layout=skip_layout, force=True)
     
     def on_clear_fits_requested(self):
         """处理清除高斯拟合请求 - 增强版"""
-        print("[Controller] Starting comprehensive fit clearing...")
+        logger.debug("Starting comprehensive fit clearing")
         
         # 清除subplot3_canvas中的拟合
-        if hasattr(self.view, 'subplot3_canvas') and hasattr(self.view.subplot3_canvas, 'clear_fits'):
-            self.view.subplot3_canvas.clear_fits()
+        subplot3_canvas = self._created_subplot3_canvas()
+        if hasattr(subplot3_canvas, 'clear_fits'):
+            subplot3_canvas.clear_fits()
             
         # 清除共享拟合数据
         if hasattr(self.view, 'shared_fit_data') and self.view.shared_fit_data:
@@ -400,21 +485,21 @@ class HistogramController:
         # 强制清除Fit Results面板
         try:
             if hasattr(self.view, 'fit_info_panel') and self.view.fit_info_panel is not None:
-                print("[Controller] Force clearing fit_info_panel")
+                logger.debug("Force clearing fit_info_panel")
                 # 直接清空列表
                 self.view.fit_info_panel.fit_list.clear()
                 # 调用正式的清除方法
                 self.view.fit_info_panel.clear_all_fits()
-                print("[Controller] Successfully force cleared fit info panel")
-        except Exception as e:
-            print(f"[Controller] Error force clearing fit_info_panel: {e}")
+                logger.debug("Successfully force cleared fit info panel")
+        except Exception:
+            logger.exception("Error force clearing fit_info_panel")
             
         # 调用视图的综合清除方法
         if hasattr(self.view, '_clear_shared_fits_on_data_change'):
             self.view._clear_shared_fits_on_data_change()
             
         self.view.status_bar.showMessage("Cleared all Gaussian fits")
-        print("[Controller] Comprehensive fit clearing completed")
+        logger.debug("Comprehensive fit clearing completed")
             
     def on_fit_selected(self, fit_index):
         """处理拟合项被选中"""
@@ -424,41 +509,46 @@ class HistogramController:
             current_canvas.highlight_fit(fit_index)
             
         # 也在subplot3_canvas中高亮显示（如果存在）
-        if hasattr(self.view, 'subplot3_canvas') and hasattr(self.view.subplot3_canvas, 'highlight_fit'):
-            self.view.subplot3_canvas.highlight_fit(fit_index)
+        subplot3_canvas = self._created_subplot3_canvas()
+        if hasattr(subplot3_canvas, 'highlight_fit'):
+            subplot3_canvas.highlight_fit(fit_index)
             
+        # 清空/重建拟合面板时会连续触发，合并显示
         if fit_index > 0:
-            self.view.status_bar.showMessage(f"Selected fit {fit_index}")
+            self.view.queue_status_message("Selected fit %s", fit_index)
         else:
-            self.view.status_bar.showMessage("No fit selected")
+            self.view.queue_status_message("No fit selected")
             
     def on_fit_deleted(self, fit_index):
         """处理单个拟合项被删除"""
-        if hasattr(self.view, 'subplot3_canvas') and hasattr(self.view.subplot3_canvas, 'delete_specific_fit'):
-            success = self.view.subplot3_canvas.delete_specific_fit(fit_index)
+        subplot3_canvas = self._created_subplot3_canvas()
+        if hasattr(subplot3_canvas, 'delete_specific_fit'):
+            success = subplot3_canvas.delete_specific_fit(fit_index)
             if success:
                 self.view.status_bar.showMessage(f"Deleted fit {fit_index}")
             
     def on_fits_deleted(self, fit_indices):
         """处理多个拟合项被删除"""
-        if hasattr(self.view, 'subplot3_canvas') and hasattr(self.view.subplot3_canvas, 'delete_specific_fit'):
-            # 从大到小排序索引，以避免删除早期项时影响后续项的索引
-            for fit_index in sorted(fit_indices, reverse=True):
-                self.view.subplot3_canvas.delete_specific_fit(fit_index)
+        subplot3_canvas = self._created_subplot3_canvas()
+        if hasattr(subplot3_canvas, 'delete_fits'):
+            # 一次删除全部选中项，面板更新和重绘只做一次
+            subplot3_canvas.delete_fits(fit_indices)
             
             self.view.status_bar.showMessage(f"Deleted {len(fit_indices)} fits")
             
     def on_fit_edited(self, fit_index, new_params):
         """处理拟合项被编辑"""
-        if hasattr(self.view, 'subplot3_canvas') and hasattr(self.view.subplot3_canvas, 'update_specific_fit'):
-            success = self.view.subplot3_canvas.update_specific_fit(fit_index, new_params)
+        subplot3_canvas = self._created_subplot3_canvas()
+        if hasattr(subplot3_canvas, 'update_specific_fit'):
+            success = subplot3_canvas.update_specific_fit(fit_index, new_params)
             if success:
                 self.view.status_bar.showMessage(f"Updated fit {fit_index}")
                 
     def on_toggle_fit_labels(self, visible):
         """切换拟合标签的可见性"""
-        if hasattr(self.view, 'subplot3_canvas') and hasattr(self.view.subplot3_canvas, 'toggle_fit_labels'):
-            self.view.subplot3_canvas.toggle_fit_labels(visible)
+        subplot3_canvas = self._created_subplot3_canvas()
+        if hasattr(subplot3_canvas, 'toggle_fit_labels'):
+            subplot3_canvas.toggle_fit_labels(visible)
             status = "visible" if visible else "hidden"
             self.view.status_bar.showMessage(f"Fit labels are now {status}")
     
@@ -6,13 +6,14 @@ Histogram Dialog - 重构版直方图分析对话框
 """
 
 import os
+import logging
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QMessageBox
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QSignalBlocker, QTimer
 from PyQt6.QtGui import QIcon
 
 # 导入模块化组件
 from .data_manager import HistogramDataManager
-from .histogram_plot import FitDataManager
+from .fitting_manager import FitDataManager
 from .ui_builder import HistogramUIBuilder
 from .signal_connector import HistogramSignalConnector, DialogEventHandler
 from .histogram_controller import HistogramController
@@ -20,6 +21,8 @@ from .export_tools import IntegratedDataExporter, ImageClipboardManager, Histogr
 # from .popup_cursor_manager import PopupCursorManager  # 不再需要，功能已集成到cursor_info_panel
 from .dialog_config import DialogConfig, UITexts
 
+logger = logging.getLogger(__name__)
+
 
 class HistogramDialog(QDialog):
     """重构版直方图分析对话框 - 简洁高效的模块化设计"""
@@ -56,11 +59,31 @@ class HistogramDialog(QDialog):
         # 事件处理器
         self.event_handler = DialogEventHandler(self)
         
+        # 直方图标签页画布，首次使用时才创建
+        self._subplot3_canvas = None
+        
         # 状态标志
+        self._canvases_ready = False
         self.fit_curves_visible = True
         self._updating_subplot3 = False
         self._changing_tab = False
         self._handling_cursor_selection = False
+        # 当前标签页索引，由标签页切换信号更新，避免各处反复查询tab_widget
+        self._current_tab = 0
+        
+        # 高频状态栏消息合并显示：定时器到期时只显示最后一条
+        self._pending_status = None
+        self._status_base = None
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(30)
+        self._status_timer.timeout.connect(self._flush_status_message)
+        
+        # 绘图区连续选择cursor时合并刷新cursor信息面板：重复启动会重新计时，只刷新一次
+        self._cursor_panel_timer = QTimer(self)
+        self._cursor_panel_timer.setSingleShot(True)
+        self._cursor_panel_timer.setInterval(20)
+        self._cursor_panel_timer.timeout.connect(self.update_cursor_info_panel)
         
     def _build_interface(self):
         """构建用户界面"""
@@ -72,23 +95,43 @@ class HistogramDialog(QDialog):
         # self.popup_cursor_manager = PopupCursorManager(self)
         # self.popup_cursor_manager.hide()
         
-        # 设置画布的共享拟合数据
+        # 设置画布的共享拟合数据（subplot3画布创建时设置）
         self.plot_canvas.set_shared_fit_data(self.shared_fit_data)
-        self.subplot3_canvas.set_shared_fit_data(self.shared_fit_data)
+        
+        # 主视图画布在此创建后不再变化，subplot3画布通过属性按需创建；
+        # 之后用此标志判断，不再用hasattr（对subplot3_canvas使用hasattr会触发创建）
+        self._canvases_ready = hasattr(self, 'plot_canvas')
+    
+    @property
+    def subplot3_canvas(self):
+        """直方图标签页画布，首次访问时才创建（打开对话框时省去第二个matplotlib画布）"""
+        if self._subplot3_canvas is None:
+            self._build_subplot3_canvas()
+        return self._subplot3_canvas
+    
+    def is_subplot3_canvas_created(self):
+        """subplot3画布是否已创建"""
+        return self._subplot3_canvas is not None
+    
+    def _build_subplot3_canvas(self):
+        """创建直方图标签页画布并连接其信号"""
+        self._subplot3_canvas = self.ui_builder.build_histogram_canvas()
+        
+        if hasattr(self, 'signal_connector'):
+            self.signal_connector.connect_subplot3_canvas_signals()
+        if hasattr(self._subplot3_canvas, 'cursor_position_updated'):
+            self._subplot3_canvas.cursor_position_updated.connect(self.on_cursor_position_updated)
         
     def _connect_signals(self):
         """连接信号和槽"""
-        # 创建控制器（会自动连接大部分信号）
+        # 创建控制器
         self.controller = HistogramController(self.data_manager, self)
         
-        # 使用信号连接器连接剩余信号
+        # 使用信号连接器连接所有信号（每个信号只连接一个处理方法，
+        # 标签页切换信号也已在信号连接器中连接）
         self.signal_connector = HistogramSignalConnector(self)
         self.signal_connector.connect_all_signals()
         
-        # 连接标签页切换信号到控制器
-        self.tab_widget.currentChanged.connect(self.controller.on_tab_changed)
-        self.tab_widget.currentChanged.connect(self.on_tab_changed)
-        
         # 初始化cursor manager与plot canvas的关联 - 不再需要
         # self.popup_cursor_manager.set_plot_widget(self.plot_canvas)
         
@@ -97,10 +140,9 @@ class HistogramDialog(QDialog):
             self.cursor_info_panel.toggle_cursors_visibility_requested.connect(self.on_toggle_cursors_visibility)
         
         # 关键新增：连接cursor位置更新信号到本对话框的处理方法
+        # （subplot3_canvas的信号在画布创建时连接）
         if hasattr(self, 'plot_canvas') and hasattr(self.plot_canvas, 'cursor_position_updated'):
             self.plot_canvas.cursor_position_updated.connect(self.on_cursor_position_updated)
-        if hasattr(self, 'subplot3_canvas') and hasattr(self.subplot3_canvas, 'cursor_position_updated'):
-            self.subplot3_canvas.cursor_position_updated.connect(self.on_cursor_position_updated)
     
     # ================ 核心业务方法 ================
     
@@ -111,19 +153,24 @@ class HistogramDialog(QDialog):
     def set_data(self, data, sampling_rate=None):
         """设置数据（外部调用接口）"""
         self.data_manager.set_data(data, sampling_rate)
-        self.file_channel_control.set_sampling_rate(self.data_manager.sampling_rate)
-        
         channels = self.data_manager.get_channels()
-        self.file_channel_control.update_channels(channels)
+        with QSignalBlocker(self.file_channel_control):
+            self.file_channel_control.set_sampling_rate(self.data_manager.sampling_rate)
+            self.file_channel_control.update_channels(channels)
         
         if channels:
+            self.data_manager.selected_channel = channels[0]
             self.controller._update_plot(channels[0])
         
         self.status_bar.showMessage("Data loaded successfully")
     
+    def is_histogram_tab(self):
+        """直方图标签页是否为当前标签页"""
+        return self._current_tab == 1
+    
     def get_current_canvas(self):
         """获取当前活动的画布"""
-        return self.subplot3_canvas if self.tab_widget.currentIndex() == 1 else self.plot_canvas
+        return self.subplot3_canvas if self._current_tab == 1 else self.plot_canvas
     
     # ================ 事件处理方法 ================
     
@@ -138,17 +185,17 @@ class HistogramDialog(QDialog):
     def on_bins_changed(self, bins):
         """直方图箱数变化处理"""
         self.controller.on_bins_changed(bins)
-        self._update_subplot3_histogram(restore_fits=False)
+        # subplot3不可见时推迟到切换到直方图标签页再重绘
+        if self._current_tab == 1:
+            self._update_subplot3_histogram(restore_fits=False)
     
     def on_highlight_size_changed(self, size_percent):
-        """高亮区域大小变化处理"""
+        """高亮区域大小变化处理（委托给控制器）"""
         self.controller.on_highlight_size_changed(size_percent)
-        self._clear_shared_fits_on_data_change()
     
     def on_highlight_position_changed(self, position_percent):
-        """高亮区域位置变化处理"""
+        """高亮区域位置变化处理（委托给控制器）"""
         self.controller.on_highlight_position_changed(position_percent)
-        self._clear_shared_fits_on_data_change()
     
     def on_log_x_changed(self, enabled):
         """X轴对数变化处理"""
@@ -157,9 +204,8 @@ class HistogramDialog(QDialog):
     def on_log_y_changed(self, enabled):
         """Y轴对数变化处理"""
         self.controller.on_log_y_changed(enabled)
-        # 检查是否被禁用
+        # 检查是否被禁用（控制器已取消勾选）
         if enabled and not self.plot_canvas.log_y:
-            self.histogram_control.log_y_check.setChecked(False)
             self.status_bar.showMessage("Y-axis log scale disabled: histogram contains zero counts")
     
     def on_kde_changed(self, enabled):
@@ -172,6 +218,7 @@ class HistogramDialog(QDialog):
     
     def on_tab_changed(self, index):
         """标签页切换处理 - 优化版，支持拟合恢复"""
+        self._current_tab = index
         if self._changing_tab:
             return
             
@@ -200,7 +247,7 @@ class HistogramDialog(QDialog):
                     # 调试输出：检查cursor数据是否正确传递
                     current_canvas = self.get_current_canvas()
                     if hasattr(current_canvas, 'cursors'):
-                        print(f"[DEBUG] Switching to histogram tab, found {len(current_canvas.cursors)} cursors")
+                        logger.debug("Switching to histogram tab, found %s cursors", len(current_canvas.cursors))
                     
                     # 在histogram tab中禁用Position Control（因为cursor不可见）
                     self.cursor_info_panel.update_position_label_for_tab(is_histogram_tab=True)
@@ -210,12 +257,13 @@ class HistogramDialog(QDialog):
             elif index == 0:  # 主视图标签页
                 self._sync_cursor_manager_to_canvas(self.plot_canvas)
                 
-                # 在切换回主视图时，更新subplot3中的拟合显示
+                # 在切换回主视图时，更新subplot3中的拟合显示（拟合未变化时跳过）
                 if (hasattr(self, 'plot_canvas') and 
-                    hasattr(self.plot_canvas, '_update_ax3_fit_display')):
-                    print("Updating Main View subplot3 fit display on tab switch")
+                    hasattr(self.plot_canvas, '_update_ax3_fit_display') and
+                    not self.plot_canvas.ax3_fits_displayed()):
+                    logger.debug("Updating Main View subplot3 fit display on tab switch")
                     self.plot_canvas._update_ax3_fit_display()
-                    self.plot_canvas.draw()
+                    self.plot_canvas.draw_idle()
                 
                 self.status_bar.showMessage(DialogConfig.STATUS_MESSAGES['main_view'])
                 
@@ -236,7 +284,7 @@ class HistogramDialog(QDialog):
     
     def on_clear_fits_requested(self):
         """清除拟合请求处理 - 增强版"""
-        print("[Dialog] Starting comprehensive fit clearing from clear button...")
+        logger.debug("[Dialog] Starting comprehensive fit clearing from clear button...")
         
         # 调用控制器的清除方法
         self.controller.on_clear_fits_requested()
@@ -248,19 +296,19 @@ class HistogramDialog(QDialog):
         # 强制清除Fit Results面板
         try:
             if hasattr(self, 'fit_info_panel') and self.fit_info_panel is not None:
-                print("[Dialog] Force clearing fit_info_panel from clear button")
+                logger.debug("[Dialog] Force clearing fit_info_panel from clear button")
                 # 直接清空列表
                 self.fit_info_panel.fit_list.clear()
                 # 调用正式的清除方法
                 self.fit_info_panel.clear_all_fits()
-                print("[Dialog] Successfully force cleared fit info panel from clear button")
+                logger.debug("[Dialog] Successfully force cleared fit info panel from clear button")
         except Exception as e:
             print(f"[Dialog] Error force clearing fit_info_panel from clear button: {e}")
             
         # 调用综合清除方法
         self._clear_shared_fits_on_data_change()
         
-        print("[Dialog] Comprehensive fit clearing from clear button completed")
+        logger.debug("[Dialog] Comprehensive fit clearing from clear button completed")
     
     def on_region_selected(self, x_min, x_max):
         """区域选择处理"""
@@ -272,9 +320,10 @@ class HistogramDialog(QDialog):
                 # 区域选择后更新显示，但不再重复清除拟合
                 self.plot_canvas.update_highlighted_plots(clear_fits=False)
             
-            self._update_subplot3_histogram(restore_fits=False)
+            # 与滑块拖动相同，合并连续的选择并在直方图标签页不可见时跳过
+            self.controller._schedule_subplot3_update()
             
-            self.status_bar.showMessage(f"Region selected: {x_min:.3f} to {x_max:.3f}")
+            self.queue_status_message("Region selected: %.3f to %.3f", x_min, x_max)
             
         except Exception as e:
             print(f"Error handling region selection: {e}")
@@ -300,7 +349,7 @@ class HistogramDialog(QDialog):
     def on_copy_fit_info(self):
         """复制拟合信息处理"""
         try:
-            if self.tab_widget.currentIndex() == 1 and hasattr(self.subplot3_canvas, 'fit_info_str'):
+            if self._current_tab == 1 and hasattr(self.subplot3_canvas, 'fit_info_str'):
                 success, message = self.exporter.copy_fit_info_to_clipboard(
                     self.subplot3_canvas.fit_info_str
                 )
@@ -346,6 +395,9 @@ class HistogramDialog(QDialog):
         """更新cursor信息面板 - 优化版，支持高频更新"""
         try:
             canvas = self.get_current_canvas()
+            # 画布没有cursor且面板已为空时无需刷新（删除最后一个cursor或切换标签页时面板非空，仍会清空）
+            if not getattr(canvas, 'cursors', None) and self.cursor_info_panel.cursor_list.count() == 0:
+                return
             if canvas and hasattr(canvas, 'get_cursor_info'):
                 cursor_info = canvas.get_cursor_info()
                 # 在tab切换时强制更新，忽略跳过标志
@@ -373,8 +425,10 @@ class HistogramDialog(QDialog):
     def update_cursor_position(self, cursor_id, new_position):
         """更新cursor位置"""
         canvas = self.get_current_canvas()
-        if hasattr(canvas, 'update_cursor_position') and canvas.update_cursor_position(cursor_id, new_position):
-            canvas.draw()
+        # 位置输入框连续变化时只移动现有线条，并合并重绘
+        if hasattr(canvas, 'update_cursor_position') and canvas.update_cursor_position(cursor_id, new_position,
+                                                                                         fast_update=True):
+            canvas.draw_idle()
             self.update_cursor_info_panel()
     
     def select_cursor(self, cursor_id):
@@ -384,10 +438,27 @@ class HistogramDialog(QDialog):
             canvas.select_cursor(cursor_id if cursor_id >= 0 else None)
             self.update_cursor_info_panel()
     
+    def queue_status_message(self, message, *args):
+        """合并显示高频的状态栏消息（选择、拖动等），连续触发时只显示最后一条
+        
+        传入args时message为%格式模板，只在真正显示时格式化
+        """
+        if not self._status_timer.isActive():
+            self._status_base = self.status_bar.currentMessage()
+            self._status_timer.start()
+        self._pending_status = (message, args)
+    
+    def _flush_status_message(self):
+        """显示合并后的状态栏消息；期间已有其他消息直接显示时（如错误信息）不再覆盖"""
+        pending, self._pending_status = self._pending_status, None
+        if pending is not None and self.status_bar.currentMessage() == self._status_base:
+            message, args = pending
+            self.status_bar.showMessage(message % args if args else message)
+    
     def on_cursor_position_changed(self, cursor_id, new_position):
         """处理Cursor位置变化 - 统一显示Y坐标"""
         # 统一显示Y坐标，因为histogram中不显示cursor
-        self.status_bar.showMessage(f"Cursor {cursor_id} moved to Y = {new_position:.4f}")
+        self.queue_status_message("Cursor %s moved to Y = %.4f", cursor_id, new_position)
         self.update_cursor_info_panel()
     
     def on_cursor_position_updated(self, cursor_id, new_position):
@@ -404,8 +475,10 @@ class HistogramDialog(QDialog):
         
     def on_cursor_selection_changed(self, cursor_id):
         """Cursor选择变化处理"""
-        status = f"Selected cursor {cursor_id}" if cursor_id >= 0 else "No cursor selected"
-        self.status_bar.showMessage(status)
+        if cursor_id >= 0:
+            self.queue_status_message("Selected cursor %s", cursor_id)
+        else:
+            self.queue_status_message("No cursor selected")
         self.update_cursor_info_panel()
     
     def on_plot_cursor_selected(self, cursor_id):
@@ -419,10 +492,13 @@ class HistogramDialog(QDialog):
             # if self.popup_cursor_manager.isVisible():
             #     self.popup_cursor_manager.update_from_plot()
             
-            self.update_cursor_info_panel()
+            # 拖动选择时该信号会连续触发，面板刷新延后合并执行
+            self._cursor_panel_timer.start()
             
-            status = f"Selected cursor {cursor_id} from plot" if cursor_id is not None and cursor_id >= 0 else "Cursor selection cleared from plot"
-            self.status_bar.showMessage(status)
+            if cursor_id is not None and cursor_id >= 0:
+                self.queue_status_message("Selected cursor %s from plot", cursor_id)
+            else:
+                self.queue_status_message("Cursor selection cleared from plot")
                 
         except Exception as e:
             print(f"Error handling plot cursor selection: {e}")
@@ -434,6 +510,8 @@ class HistogramDialog(QDialog):
     def on_export_comprehensive(self):
         """综合导出处理"""
         try:
+            self._prepare_images_for_export()
+            
             success, message = self.integrated_exporter.export_comprehensive_data()
             
             if success:
@@ -452,10 +530,12 @@ class HistogramDialog(QDialog):
     def on_copy_images(self):
         """图像复制处理"""
         try:
-            if not hasattr(self, 'plot_canvas') or not hasattr(self, 'subplot3_canvas'):
+            if not self._canvases_ready:
                 self.status_bar.showMessage("No images available to copy")
                 return
             
+            self._prepare_images_for_export()
+            
             success, message = ImageClipboardManager.copy_combined_images_to_clipboard(
                 self.plot_canvas, self.subplot3_canvas
             )
@@ -473,6 +553,13 @@ class HistogramDialog(QDialog):
     
     # ================ 工具方法 ================
     
+    def _prepare_images_for_export(self):
+        """导出或复制图像前确保两个视图都已完整：推迟绘制的subplot3直方图和后台计算中的KDE曲线"""
+        self.controller._update_subplot3_histogram()
+        self.plot_canvas.wait_for_kde()
+        if self.is_subplot3_canvas_created():
+            self.subplot3_canvas.wait_for_kde()
+    
     def _update_subplot3_histogram(self, restore_fits=True):
         """更新subplot3直方图 - 支持拟合曲线恢复"""
         if self._updating_subplot3 or not hasattr(self.plot_canvas, 'data') or self.plot_canvas.data is None:
@@ -481,23 +568,21 @@ class HistogramDialog(QDialog):
         try:
             self._updating_subplot3 = True
             
-            print(f"Updating subplot3 histogram, restore_fits={restore_fits}")
+            logger.debug("Updating subplot3 histogram, restore_fits=%s", restore_fits)
             
             # 更新直方图
             self.controller._update_subplot3_histogram()
             
-            # 设置subplot3_canvas的parent_dialog
-            self.subplot3_canvas.parent_dialog = self
-            
-            # 根据参数决定是否恢复拟合数据
-            if restore_fits and hasattr(self, 'shared_fit_data') and self.shared_fit_data and self.shared_fit_data.has_fits():
-                print(f"Restoring {len(self.shared_fit_data.gaussian_fits)} fits to subplot3")
+            # 根据参数决定是否恢复拟合数据（subplot3已显示最新的拟合时跳过）
+            if (restore_fits and hasattr(self, 'shared_fit_data') and self.shared_fit_data and
+                    self.shared_fit_data.has_fits() and not self.subplot3_canvas.shared_fits_displayed()):
+                logger.debug("Restoring %s fits to subplot3", len(self.shared_fit_data.gaussian_fits))
                 # 延迟恢复拟合，确保直方图已经绘制完成
                 from PyQt6.QtCore import QTimer
                 QTimer.singleShot(50, self._restore_fits_to_subplot3)
             
             # 在Histogram标签页时更新cursor manager关联
-            if self.tab_widget.currentIndex() == 1:
+            if self._current_tab == 1:
                 self._sync_cursor_manager_to_canvas(self.subplot3_canvas)
                 # 同步cursor可见性状态
                 if hasattr(self.plot_canvas, 'get_cursors_visible') and hasattr(self.subplot3_canvas, 'set_cursors_visible'):
@@ -516,30 +601,34 @@ class HistogramDialog(QDialog):
     
     def _clear_shared_fits_on_data_change(self):
         """数据变化时清除共享拟合数据 - 增强版"""
-        print("[Fix] Starting comprehensive fit data clearing...")
+        # 没有任何拟合时（拖动高亮区域的常见情况）无需清除面板和重绘画布
+        if not self._has_fit_state():
+            return
+        
+        logger.debug("[Fix] Starting comprehensive fit data clearing...")
         
         # 第1步：清除共享拟合数据
         if hasattr(self, 'shared_fit_data') and self.shared_fit_data:
             if self.shared_fit_data.has_fits():
-                print(f"[Fix] Clearing shared fit data: {len(self.shared_fit_data.gaussian_fits)} fits")
+                logger.debug("Clearing shared fit data: %s fits", len(self.shared_fit_data.gaussian_fits))
                 self.shared_fit_data.clear_fits()
             else:
-                print("[Fix] No fits in shared data to clear")
+                logger.debug("[Fix] No fits in shared data to clear")
         else:
-            print("[Fix] No shared_fit_data found")
+            logger.debug("[Fix] No shared_fit_data found")
             
-        # 第2步：清除subplot3_canvas中的拟合显示
-        if hasattr(self, 'subplot3_canvas'):
+        # 第2步：清除subplot3_canvas中的拟合显示（画布尚未创建时无需清除）
+        if self.is_subplot3_canvas_created():
             try:
                 if hasattr(self.subplot3_canvas, 'clear_fits'):
                     self.subplot3_canvas.clear_fits()
-                    print("[Fix] Cleared fits from subplot3_canvas")
+                    logger.debug("[Fix] Cleared fits from subplot3_canvas")
                     
                 # 清除subplot3_canvas自身的拟合数据
                 if hasattr(self.subplot3_canvas, 'fitting_manager') and self.subplot3_canvas.fitting_manager:
                     if hasattr(self.subplot3_canvas.fitting_manager, 'gaussian_fits'):
                         self.subplot3_canvas.fitting_manager.gaussian_fits.clear()
-                        print("[Fix] Cleared subplot3_canvas fitting_manager gaussian_fits")
+                        logger.debug("[Fix] Cleared subplot3_canvas fitting_manager gaussian_fits")
                         
             except Exception as e:
                 print(f"[Fix] Error clearing subplot3_canvas: {e}")
@@ -555,13 +644,13 @@ class HistogramDialog(QDialog):
                         except:
                             pass
                     self.plot_canvas._ax3_fit_lines.clear()
-                    print("[Fix] Cleared fits from main view subplot3")
+                    logger.debug("[Fix] Cleared fits from main view subplot3")
                     
                 # 清除plot_canvas自身的拟合数据
                 if hasattr(self.plot_canvas, 'fitting_manager') and self.plot_canvas.fitting_manager:
                     if hasattr(self.plot_canvas.fitting_manager, 'gaussian_fits'):
                         self.plot_canvas.fitting_manager.gaussian_fits.clear()
-                        print("[Fix] Cleared plot_canvas fitting_manager gaussian_fits")
+                        logger.debug("[Fix] Cleared plot_canvas fitting_manager gaussian_fits")
                         
             except Exception as e:
                 print(f"[Fix] Error clearing plot_canvas: {e}")
@@ -569,7 +658,7 @@ class HistogramDialog(QDialog):
         # 第4步：强制清除拟合信息面板
         try:
             if hasattr(self, 'fit_info_panel') and self.fit_info_panel is not None:
-                print("[Fix] Force clearing fit_info_panel")
+                logger.debug("[Fix] Force clearing fit_info_panel")
                 # 直接清空列表
                 self.fit_info_panel.fit_list.clear()
                 # 调用正式的清除方法
@@ -577,24 +666,38 @@ class HistogramDialog(QDialog):
                 # 显示提示信息
                 self.fit_info_panel.info_label.show()
                 self.fit_info_panel.stats_label.setText("Select a fit to view its details")
-                print("[Fix] Successfully force cleared fit info panel")
+                logger.debug("[Fix] Successfully force cleared fit info panel")
             else:
-                print("[Fix] fit_info_panel not found or is None")
-        except Exception as e:
-            print(f"[Fix] Error force clearing fit_info_panel: {e}")
-            import traceback
-            traceback.print_exc()
+                logger.debug("[Fix] fit_info_panel not found or is None")
+        except Exception:
+            logger.exception("Error force clearing fit_info_panel")
                 
         # 第5步：重绘所有相关的画布
         try:
-            if hasattr(self, 'subplot3_canvas'):
-                self.subplot3_canvas.draw()
+            if self.is_subplot3_canvas_created():
+                self.subplot3_canvas.draw_idle()
             if hasattr(self, 'plot_canvas'):
-                self.plot_canvas.draw()
+                self.plot_canvas.draw_idle()
         except Exception as e:
             print(f"[Fix] Error redrawing canvases: {e}")
                 
-        print("[Fix] Comprehensive fit data clearing completed")
+        logger.debug("[Fix] Comprehensive fit data clearing completed")
+    
+    def _has_fit_state(self):
+        """共享数据、两个画布或拟合信息面板中是否还有需要清除的拟合"""
+        if getattr(self, 'shared_fit_data', None) and self.shared_fit_data.has_fits():
+            return True
+        canvases = [self.plot_canvas] if self._canvases_ready else []
+        if self.is_subplot3_canvas_created():
+            canvases.append(self._subplot3_canvas)
+        for canvas in canvases:
+            if getattr(canvas, '_ax3_fit_lines', None):
+                return True
+            fitting_manager = getattr(canvas, 'fitting_manager', None)
+            if fitting_manager is not None and getattr(fitting_manager, 'gaussian_fits', None):
+                return True
+        fit_info_panel = getattr(self, 'fit_info_panel', None)
+        return fit_info_panel is not None and fit_info_panel.fit_list.count() > 0
     
     def _restore_fits_to_subplot3(self):
         """恢复拟合曲线到subplot3"""
@@ -603,128 +706,113 @@ class HistogramDialog(QDialog):
                 return
                 
             if not self.shared_fit_data or not self.shared_fit_data.has_fits():
-                print("No shared fit data to restore to subplot3")
+                logger.debug("No shared fit data to restore to subplot3")
                 return
                 
-            print(f"Restoring {len(self.shared_fit_data.gaussian_fits)} fits to subplot3")
+            logger.debug("Restoring %s fits to subplot3", len(self.shared_fit_data.gaussian_fits))
             
             # 调用subplot3_canvas的恢复方法
             if hasattr(self.subplot3_canvas, 'restore_fits_from_shared_data'):
                 success = self.subplot3_canvas.restore_fits_from_shared_data()
                 if success:
-                    print("Successfully restored fits to subplot3")
+                    logger.debug("Successfully restored fits to subplot3")
                     # 更新绘图
-                    self.subplot3_canvas.draw()
+                    self.subplot3_canvas.draw_idle()
                 else:
-                    print("Failed to restore fits to subplot3")
+                    logger.debug("Failed to restore fits to subplot3")
             else:
-                print("subplot3_canvas does not support restore_fits_from_shared_data")
+                logger.debug("subplot3_canvas does not support restore_fits_from_shared_data")
                 
-        except Exception as e:
-            print(f"Error restoring fits to subplot3: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error restoring fits to subplot3")
     
     def _sync_cursor_manager_to_canvas(self, canvas):
         """同步cursor manager到指定画布 - 修复重复创建问题"""
         # 确保两个画布之间的cursor数据同步，但histogram不显示cursor
         try:
-            if canvas == self.subplot3_canvas:
+            if canvas is not None and canvas is self._subplot3_canvas:
                 # 切换到histogram tab时，将主视图的cursor数据同步到subplot3
                 if hasattr(self.plot_canvas, 'cursor_manager') and hasattr(self.subplot3_canvas, 'cursor_manager'):
-                    # 只同步基本数据，不复制线条引用
-                    source_cursors = self.plot_canvas.cursor_manager.cursors
-                    target_cursors = []
-                    
-                    for cursor in source_cursors:
-                        # 只复制基本数据，不复制线条引用
-                        cursor_copy = {
-                            'id': cursor['id'],
-                            'y_position': cursor['y_position'],
-                            'color': cursor['color'],
-                            'selected': cursor.get('selected', False),
-                            'line_ax2': None,  # 不复制线条引用
-                            'line_ax3': None,  # 不复制线条引用
-                            'histogram_line': None  # histogram模式下不创建
-                        }
-                        target_cursors.append(cursor_copy)
+                    # 两个视图的cursor数据已一致（上次切换后没有增删或移动）时无需重新复制
+                    if (self._cursor_snapshot(self.plot_canvas.cursor_manager) ==
+                            self._cursor_snapshot(self.subplot3_canvas.cursor_manager)):
+                        return
                     
-                    self.subplot3_canvas.cursor_manager.cursors = target_cursors
+                    # 只同步基本数据，不复制线条引用（histogram模式下不创建线条）
+                    self._copy_cursor_data(self.plot_canvas, self.subplot3_canvas)
                     
-                    # 同步cursor计数器
-                    self.subplot3_canvas.cursor_manager.cursor_counter = self.plot_canvas.cursor_manager.cursor_counter
-                    
-                    # 同步选中状态
-                    if hasattr(self.plot_canvas.cursor_manager, 'selected_cursor') and self.plot_canvas.cursor_manager.selected_cursor:
-                        selected_id = self.plot_canvas.cursor_manager.selected_cursor.get('id')
-                        for cursor in self.subplot3_canvas.cursor_manager.cursors:
-                            if cursor.get('id') == selected_id:
-                                self.subplot3_canvas.cursor_manager.selected_cursor = cursor
-                                break
-                    else:
-                        self.subplot3_canvas.cursor_manager.selected_cursor = None
-                    
-                    # 同步可见性状态
-                    self.subplot3_canvas.cursor_manager.cursors_visible = self.plot_canvas.cursor_manager.cursors_visible
-                    
-                    # 同步兼容性属性
-                    self._sync_compatibility_attributes(self.subplot3_canvas)
-                    
-                    print(f"Synced {len(self.subplot3_canvas.cursor_manager.cursors)} cursors to histogram view (data only, no display)")
+                    logger.debug("Synced %s cursors to histogram view (data only, no display)", len(self.subplot3_canvas.cursor_manager.cursors))
                     
             elif canvas == self.plot_canvas:
-                # 切换到主视图时，将subplot3的cursor数据同步到主视图
-                if hasattr(self.subplot3_canvas, 'cursor_manager') and hasattr(self.plot_canvas, 'cursor_manager'):
-                    # 只同步基本数据，不复制线条引用
-                    source_cursors = self.subplot3_canvas.cursor_manager.cursors
-                    target_cursors = []
-                    
-                    for cursor in source_cursors:
-                        # 只复制基本数据，不复制线条引用
-                        cursor_copy = {
-                            'id': cursor['id'],
-                            'y_position': cursor['y_position'],
-                            'color': cursor['color'],
-                            'selected': cursor.get('selected', False),
-                            'line_ax2': None,  # 稍后重新创建
-                            'line_ax3': None,  # 稍后重新创建
-                            'histogram_line': None
-                        }
-                        target_cursors.append(cursor_copy)
+                # 切换到主视图时，将subplot3的cursor数据同步到主视图（subplot3画布未创建时无需同步）
+                if (self.is_subplot3_canvas_created() and hasattr(self.subplot3_canvas, 'cursor_manager') and
+                        hasattr(self.plot_canvas, 'cursor_manager')):
+                    # cursor数据未在直方图标签页中改变且主视图的线条仍在图上时，无需重建所有cursor线条
+                    if (self._cursor_snapshot(self.subplot3_canvas.cursor_manager) ==
+                            self._cursor_snapshot(self.plot_canvas.cursor_manager) and
+                            self._cursor_lines_attached(self.plot_canvas)):
+                        return
                     
-                    self.plot_canvas.cursor_manager.cursors = target_cursors
+                    # 只同步基本数据，线条稍后重新创建
+                    self._copy_cursor_data(self.subplot3_canvas, self.plot_canvas)
                     
-                    # 同步cursor计数器
-                    self.plot_canvas.cursor_manager.cursor_counter = self.subplot3_canvas.cursor_manager.cursor_counter
+                    # 在主视图中正常显示cursor，刷新方法中包含强制清理后重新创建线条
+                    if hasattr(self.plot_canvas, 'refresh_cursors_after_plot_update'):
+                        self.plot_canvas.refresh_cursors_after_plot_update()
                     
-                    # 同步选中状态
-                    if hasattr(self.subplot3_canvas.cursor_manager, 'selected_cursor') and self.subplot3_canvas.cursor_manager.selected_cursor:
-                        selected_id = self.subplot3_canvas.cursor_manager.selected_cursor.get('id')
-                        for cursor in self.plot_canvas.cursor_manager.cursors:
-                            if cursor.get('id') == selected_id:
-                                self.plot_canvas.cursor_manager.selected_cursor = cursor
-                                break
-                    else:
-                        self.plot_canvas.cursor_manager.selected_cursor = None
+                    logger.debug("Synced %s cursors to main view (with display)", len(self.plot_canvas.cursor_manager.cursors))
                     
-                    # 同步可见性状态
-                    self.plot_canvas.cursor_manager.cursors_visible = self.subplot3_canvas.cursor_manager.cursors_visible
-                    
-                    # 同步兼容性属性
-                    self._sync_compatibility_attributes(self.plot_canvas)
-                    
-                    # 在主视图中正常显示cursor，使用强制清理重新创建线条
-                    if hasattr(self.plot_canvas, 'cursor_manager'):
-                        # 直接调用刷新方法，其中包含了强制清理
-                        if hasattr(self.plot_canvas, 'refresh_cursors_after_plot_update'):
-                            self.plot_canvas.refresh_cursors_after_plot_update()
-                    
-                    print(f"Synced {len(self.plot_canvas.cursor_manager.cursors)} cursors to main view (with display)")
-                    
-        except Exception as e:
-            print(f"Error syncing cursor data: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error syncing cursor data")
+    
+    def _copy_cursor_data(self, source_canvas, target_canvas):
+        """把源画布的cursor数据（id、位置、颜色、选中和可见状态、计数器）复制到目标画布，不复制线条引用"""
+        source = source_canvas.cursor_manager
+        target = target_canvas.cursor_manager
+        
+        selected = getattr(source, 'selected_cursor', None)
+        selected_id = selected.get('id') if selected else None
+        
+        # 复制时顺便找出选中的cursor，不必再遍历一次
+        target_cursors = []
+        target_selected = None
+        for cursor in source.cursors:
+            cursor_copy = {
+                'id': cursor['id'],
+                'y_position': cursor['y_position'],
+                'color': cursor['color'],
+                'selected': cursor.get('selected', False),
+                'line_ax2': None,
+                'line_ax3': None,
+                'histogram_line': None
+            }
+            if target_selected is None and selected_id is not None and cursor['id'] == selected_id:
+                target_selected = cursor_copy
+            target_cursors.append(cursor_copy)
+        
+        target.cursors = target_cursors
+        target.cursor_counter = source.cursor_counter
+        target.selected_cursor = target_selected
+        target.cursors_visible = source.cursors_visible
+        
+        # 同步兼容性属性
+        self._sync_compatibility_attributes(target_canvas)
+    
+    @staticmethod
+    def _cursor_snapshot(cursor_manager):
+        """cursor管理器的数据快照（不含线条引用），用于判断两个视图的cursor是否一致"""
+        selected = getattr(cursor_manager, 'selected_cursor', None)
+        return (tuple((cursor['id'], cursor['y_position'], cursor['color'], cursor.get('selected', False))
+                      for cursor in cursor_manager.cursors),
+                cursor_manager.cursor_counter,
+                selected.get('id') if selected else None,
+                cursor_manager.cursors_visible)
+    
+    @staticmethod
+    def _cursor_lines_attached(canvas):
+        """主视图每个cursor的线条是否都还在ax2/ax3上（重绘子图后线条会被清除）"""
+        return all(cursor.get('line_ax2') in canvas.ax2.lines and cursor.get('line_ax3') in canvas.ax3.lines
+                   for cursor in canvas.cursor_manager.cursors)
     
     def _sync_compatibility_attributes(self, canvas):
         """同步兼容性属性，确保旧代码正常工作"""
@@ -760,12 +848,7 @@ class HistogramDialog(QDialog):
         try:
             self.fit_curves_visible = not self.fit_curves_visible
             
-            if hasattr(self.plot_canvas, '_ax3_fit_lines') and self.plot_canvas._ax3_fit_lines:
-                for line in self.plot_canvas._ax3_fit_lines:
-                    if line and hasattr(line, 'set_visible'):
-                        line.set_visible(self.fit_curves_visible)
-                
-                self.plot_canvas.draw()
+            if self.plot_canvas.set_ax3_fits_visible(self.fit_curves_visible):
                 status = "visible" if self.fit_curves_visible else "hidden"
                 self.status_bar.showMessage(f"Fit curves in main view are now {status}")
             else:
@@ -785,7 +868,8 @@ class HistogramDialog(QDialog):
                 
                 # 同步到两个画布
                 if current_canvas == self.plot_canvas:
-                    if hasattr(self.subplot3_canvas, 'set_cursors_visible'):
+                    # subplot3画布未创建时，切换标签页会从主视图同步可见性
+                    if self.is_subplot3_canvas_created() and hasattr(self.subplot3_canvas, 'set_cursors_visible'):
                         self.subplot3_canvas.set_cursors_visible(new_visibility)
                 elif current_canvas == self.subplot3_canvas:
                     if hasattr(self.plot_canvas, 'set_cursors_visible'):
@@ -809,6 +893,4 @@ class HistogramDialog(QDialog):
                 
         except Exception as e:
             self.status_bar.showMessage(f"Error toggling cursor visibility: {str(e)}")
-            print(f"Error in on_toggle_cursors_visibility: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error in on_toggle_cursors_visibility")
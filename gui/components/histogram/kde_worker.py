@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KDE Worker - 核密度估计工作线程
+在后台线程中计算KDE曲线，高亮区域数据量大时不阻塞界面
+"""
+
+import numpy as np
+from PyQt6.QtCore import QObject, QThread
+
+from .plot_utils import KernelDensityEstimator
+
+# 正在运行的工作线程；线程对象被Qt删除前一直保持引用，画布先被销毁时线程也不会被提前析构
+_running_workers = set()
+
+
+class KdeWorker(QThread):
+    """KDE计算工作线程，结果保存在result中：(x_range, density)，失败时为None"""
+
+    def __init__(self, sample, lo, hi, n_points):
+        super().__init__()
+        self.sample = sample
+        self.lo = lo
+        self.hi = hi
+        self.n_points = n_points
+        self.result = None
+
+    def run(self):
+        try:
+            x_range = np.linspace(self.lo, self.hi, self.n_points)
+            self.result = (x_range, KernelDensityEstimator.gaussian_kde(self.sample, x_range))
+        except Exception as e:
+            print(f"Error computing KDE: {e}")
+
+
+class KdeRunner(QObject):
+    """管理画布的后台KDE计算
+
+    同时只运行一个工作线程；计算期间的新请求只保留最新一个，被取代或取消的结果直接丢弃
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._worker = None
+        self._callback = None
+        self._pending = None
+
+    def request(self, sample, lo, hi, n_points, callback):
+        """请求在[lo, hi]上计算n_points个点的KDE，完成后在GUI线程调用callback(x_range, density)"""
+        # 复制样本：调用方的数据（如取反缓冲区）在计算期间可能被改写
+        self._pending = (np.array(sample), lo, hi, n_points, callback)
+        if self._worker is None:
+            self._start_next()
+
+    def cancel(self):
+        """丢弃尚未返回的KDE结果（画布内容已清除或KDE已关闭）"""
+        self._pending = None
+        self._callback = None
+
+    def is_busy(self):
+        """是否有KDE仍在计算或等待计算"""
+        return self._worker is not None or self._pending is not None
+
+    def wait(self):
+        """等待所有KDE计算完成并立即处理结果（导出图像等需要完整图像的场景）"""
+        while self._worker is not None:
+            worker = self._worker
+            worker.wait()
+            self._finish(worker)
+
+    def _start_next(self):
+        """启动等待中的最新请求"""
+        sample, lo, hi, n_points, callback = self._pending
+        self._pending = None
+        self._callback = callback
+
+        worker = KdeWorker(sample, lo, hi, n_points)
+        _running_workers.add(worker)
+        worker.finished.connect(self._on_worker_finished)
+        # 线程结束后由Qt延迟删除（不在界面线程中阻塞等待），删除时再释放引用
+        worker.finished.connect(worker.deleteLater)
+        worker.destroyed.connect(lambda: _running_workers.discard(worker))
+        self._worker = worker
+        worker.start()
+
+    def _on_worker_finished(self):
+        """工作线程结束（已由wait()处理过的线程直接忽略）"""
+        self._finish(self.sender())
+
+    def _finish(self, worker):
+        """处理结束的工作线程：结果仍有效时回调，然后启动等待中的请求"""
+        if worker is not self._worker:
+            return
+        self._worker = None
+        callback, self._callback = self._callback, None
+
+        # 计算期间有了更新的请求时，这次的结果已过期
+        if self._pending is not None:
+            self._start_next()
+        elif callback is not None and worker.result is not None:
+            callback(*worker.result)
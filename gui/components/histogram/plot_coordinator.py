@@ -5,13 +5,17 @@ Plot Coordinator - 绘图协调器
 组合和协调各个管理器，提供统一的接口
 """
 
+import logging
+
 import numpy as np
 from PyQt6.QtCore import pyqtSignal, Qt
 
 from .base_plot import BasePlot
 from .cursor_manager import CursorManager
 from .fitting_manager import FittingManager
-from .plot_utils import RecursionGuard, DataCleaner, AxisCalculator
+from .plot_utils import RecursionGuard, DataCleaner, AxisCalculator, HistogramCalculator, DataHasher
+
+logger = logging.getLogger(__name__)
 
 
 class HistogramPlot(BasePlot):
@@ -36,6 +40,16 @@ class HistogramPlot(BasePlot):
         self.is_histogram_mode = False
         self.histogram_data = None
         self.histogram_bins = 50
+        # histogram_data的哈希值，每次设置histogram_data时清空，首次需要时才计算
+        self._histogram_data_hash = None
+        
+        # 直方图模式下最近一次tight_layout计算出的子图边距
+        self._subplot3_layout = None
+        
+        # KDE计算结果缓存 (data_key, x_range, density)，只与数据有关
+        self._kde_cache = None
+        # histogram_data对应的精确输入（由控制器传入，如数据版本、高亮范围、取反），作为KDE缓存的键
+        self._histogram_data_key = None
         
         # 连接管理器的信号
         self._connect_manager_signals()
@@ -105,7 +119,7 @@ class HistogramPlot(BasePlot):
             
             cursor_id = self.add_cursor(y_position)
             if cursor_id is not None:
-                print(f"Added cursor at position {y_position:.4f}")
+                logger.debug("Added cursor at position %.4f", y_position)
                 # 可以发送信号通知父组件
                 if hasattr(self.parent_dialog, 'update_cursor_info_panel'):
                     self.parent_dialog.update_cursor_info_panel()
@@ -117,7 +131,7 @@ class HistogramPlot(BasePlot):
         """设置共享的拟合数据引用"""
         self.shared_fit_data = shared_fit_data
         self.fitting_manager.set_shared_fit_data(shared_fit_data)
-        print(f"Set shared fit data: {shared_fit_data}")
+        logger.debug("Set shared fit data: %s", shared_fit_data)
     
     # =================== Cursor 功能代理方法 ===================
     
@@ -153,9 +167,9 @@ class HistogramPlot(BasePlot):
             self.selected_cursor = self.cursor_manager.selected_cursor
         return success
     
-    def update_cursor_position(self, cursor_id, new_position):
-        """更新cursor位置"""
-        return self.cursor_manager.update_cursor_position(cursor_id, new_position)
+    def update_cursor_position(self, cursor_id, new_position, fast_update=False):
+        """更新cursor位置（fast_update=True时直接移动现有线条，不重建）"""
+        return self.cursor_manager.update_cursor_position(cursor_id, new_position, fast_update)
     
     def get_cursor_info(self):
         """获取cursor信息"""
@@ -191,6 +205,10 @@ class HistogramPlot(BasePlot):
         """删除特定拟合"""
         return self.fitting_manager.delete_specific_fit(fit_index)
     
+    def delete_fits(self, fit_indices):
+        """批量删除拟合，只重绘一次"""
+        return self.fitting_manager.delete_fits(fit_indices)
+    
     def save_current_fits(self):
         """保存当前拟合"""
         self.fitting_manager.save_current_fits()
@@ -199,6 +217,10 @@ class HistogramPlot(BasePlot):
         """从共享数据恢复拟合"""
         return self.fitting_manager.restore_fits_from_shared_data()
     
+    def shared_fits_displayed(self):
+        """共享拟合是否已显示在当前图表上（无需重新恢复）"""
+        return self.fitting_manager.shared_fits_displayed()
+    
     def toggle_fit_labels(self, visible):
         """切换拟合标签可见性"""
         self.fitting_manager.toggle_fit_labels(visible)
@@ -209,27 +231,41 @@ class HistogramPlot(BasePlot):
     
     # =================== 直方图模式方法 ===================
     
-    def plot_subplot3_histogram(self, data, bins=50, log_x=False, log_y=False, show_kde=False, file_name=""):
-        """为subplot3绘制直方图（直方图标签页模式）"""
+    def plot_subplot3_histogram(self, data, bins=50, log_x=False, log_y=False, show_kde=False, file_name="",
+                                skip_layout=False, bin_edges=None, data_range=None, counts=None, data_key=None):
+        """为subplot3绘制直方图（直方图标签页模式）
+        
+        skip_layout=True时复用上一次tight_layout的边距，避免拖动滑块时重复求解布局；
+        bin_edges为同一数据之前算出的箱边界，data_range为已知的数据(min, max)，传入时不再扫描最值；
+        counts为与bin_edges对应的已算好的计数（如主视图ax3的直方图），传入时不再分箱；
+        data_key唯一标识data的内容（与箱数无关），相同时复用上次的KDE曲线，为None时不缓存。
+        成功绘制时返回使用的箱边界
+        """
         try:
             # 清理数据
             cleaned_data = self.data_cleaner.clean_data(data)
             if cleaned_data is None or len(cleaned_data) == 0:
-                print("Warning: No valid data for subplot3 histogram")
+                logger.warning("No valid data for subplot3 histogram")
                 return
             
             # 设置直方图模式
             self.is_histogram_mode = True
             self.histogram_data = cleaned_data
+            self._histogram_data_hash = None
+            self._histogram_data_key = data_key
             self.histogram_bins = bins
             
-            # 清除当前figure并创建新的subplot
+            # 清除当前figure并创建新的subplot（尚未返回的KDE结果不再绘制）
+            self.kde_runner.cancel()
             self.fig.clear()
             self.ax = self.fig.add_subplot(111)
             
-            # 绘制直方图
+            # 绘制直方图（先用均匀分箱快速路径计数，再按权重绘制，避免ax.hist对全部数据再分箱一次）
+            if counts is None or bin_edges is None:
+                counts, bin_edges = HistogramCalculator.uniform_histogram(cleaned_data, bins, bin_edges=bin_edges,
+                                                                      data_range=data_range)
             self.hist_counts, self.hist_bin_edges, _ = self.ax.hist(
-                cleaned_data, bins=bins, alpha=0.7, density=False
+                bin_edges[:-1], bins=bin_edges, weights=counts, alpha=0.7, density=False
             )
             
             # 计算bin中心点
@@ -251,40 +287,11 @@ class HistogramPlot(BasePlot):
             self.ax.set_ylabel("Count", fontsize=10)
             
             # 设置对数刻度
-            if log_x:
-                try:
-                    self.ax.set_xscale('log')
-                except:
-                    print("Cannot set X-axis to log scale")
-            
-            if log_y:
-                if self._check_log_scale_validity():
-                    try:
-                        self.ax.set_yscale('log')
-                    except:
-                        print("Cannot set Y-axis to log scale")
-                        self.ax.set_yscale('linear')
-                else:
-                    print("Y-axis log scale disabled: histogram contains zero counts")
-                    self.ax.set_yscale('linear')
+            self._apply_subplot3_scales(log_x, log_y)
             
             # 添加KDE曲线
-            if show_kde and len(cleaned_data) > 1:
-                try:
-                    from scipy.stats import gaussian_kde
-                    kde = gaussian_kde(cleaned_data)
-                    x_range = np.linspace(cleaned_data.min(), cleaned_data.max(), 200)
-                    kde_values = kde(x_range)
-                    
-                    # 将KDE值缩放到直方图的尺度
-                    scale_factor = len(cleaned_data) * (self.hist_bin_edges[1] - self.hist_bin_edges[0])
-                    kde_values = kde_values * scale_factor
-                    
-                    self.kde_line = self.ax.plot(x_range, kde_values, 'r-', 
-                                               linewidth=2, alpha=0.8, label='KDE')[0]
-                    self.ax.legend()
-                except Exception as e:
-                    print(f"Error adding KDE: {e}")
+            if show_kde:
+                self._draw_subplot3_kde(cleaned_data)
             
             # 添加网格线
             self.ax.grid(True, linestyle='--', alpha=0.7)
@@ -297,15 +304,118 @@ class HistogramPlot(BasePlot):
                 self.refresh_cursors_for_histogram_mode()
             
             # 调整布局
-            self.fig.tight_layout(pad=1.0)
+            self._apply_subplot3_layout(skip_layout)
             
             # 绘制
-            self.guard.throttled_draw(self)
+            self.draw_idle()
+            
+            return bin_edges
+            
+        except Exception:
+            logger.exception("Error plotting subplot3 histogram")
+    
+    def apply_subplot3_display_options(self, log_x=False, log_y=False, show_kde=False, skip_layout=False):
+        """只更新subplot3直方图的坐标轴刻度和KDE曲线，不重新计算直方图
+        
+        Returns:
+            bool: 当前没有可复用的直方图时返回False，调用方需要完整重绘
+        """
+        if not self.is_histogram_mode or self.histogram_data is None or getattr(self, 'ax', None) is None:
+            return False
+        
+        try:
+            self._apply_subplot3_scales(log_x, log_y)
+            
+            # 按需显示或隐藏KDE曲线（已绘制过的曲线直接切换可见性）
+            has_kde = self.kde_line is not None and self.kde_line in self.ax.lines
+            if show_kde and not has_kde:
+                self._draw_subplot3_kde(self.histogram_data)
+            elif has_kde:
+                self.kde_line.set_visible(show_kde)
+                legend = self.ax.get_legend()
+                if legend is not None:
+                    legend.set_visible(show_kde)
+            else:
+                # KDE已关闭，仍在后台计算的曲线不再绘制
+                self.kde_runner.cancel()
             
+            self._apply_subplot3_layout(skip_layout)
+            self.draw_idle()
+            return True
+            
+        except Exception as e:
+            print(f"Error updating subplot3 display options: {e}")
+            return False
+    
+    def _apply_subplot3_scales(self, log_x, log_y):
+        """设置subplot3直方图的坐标轴刻度"""
+        if log_x:
+            try:
+                self.ax.set_xscale('log')
+            except:
+                logger.warning("Cannot set X-axis to log scale")
+        else:
+            self.ax.set_xscale('linear')
+        
+        if log_y:
+            if self._check_log_scale_validity():
+                try:
+                    self.ax.set_yscale('log')
+                except:
+                    logger.warning("Cannot set Y-axis to log scale")
+                    self.ax.set_yscale('linear')
+            else:
+                logger.debug("Y-axis log scale disabled: histogram contains zero counts")
+                self.ax.set_yscale('linear')
+        else:
+            self.ax.set_yscale('linear')
+    
+    def _draw_subplot3_kde(self, data):
+        """在subplot3直方图上绘制KDE曲线"""
+        if len(data) <= 1:
+            return
+        
+        try:
+            # 将KDE值缩放到直方图的尺度
+            scale_factor = len(data) * (self.hist_bin_edges[1] - self.hist_bin_edges[0])
+            
+            # KDE只取决于数据本身（与箱数、坐标轴无关），数据未变时复用上次结果；
+            # 键用调用方给出的精确输入，不用统计量哈希（小量级数据四舍五入后不同窗口会得到相同的哈希）
+            data_key = self._histogram_data_key if data is self.histogram_data else None
+            if self._kde_cache is not None and data_key is not None and self._kde_cache[0] == data_key:
+                _, x_range, density = self._kde_cache
+                self._add_subplot3_kde_line(x_range, density * scale_factor)
+                return
+            
+            # 否则在后台线程计算，完成时直方图已被重绘（换了坐标轴）则只缓存结果
+            ax = self.ax
+            
+            def on_kde_ready(x_range, density):
+                if data_key is not None:
+                    self._kde_cache = (data_key, x_range, density)
+                if self.is_histogram_mode and self.ax is ax:
+                    self._add_subplot3_kde_line(x_range, density * scale_factor)
+                    self.draw_idle()
+            
+            self.kde_runner.request(data, data.min(), data.max(), 200, on_kde_ready)
         except Exception as e:
-            print(f"Error plotting subplot3 histogram: {e}")
-            import traceback
-            traceback.print_exc()
+            print(f"Error adding KDE: {e}")
+    
+    def _add_subplot3_kde_line(self, x_range, kde_values):
+        """在subplot3直方图上添加KDE曲线和图例"""
+        self.kde_line = self.ax.plot(x_range, kde_values, 'r-', 
+                                   linewidth=2, alpha=0.8, label='KDE')[0]
+        self.ax.legend()
+    
+    def _apply_subplot3_layout(self, skip_layout=False):
+        """调整subplot3布局（fig.clear()会重置边距，跳过时直接恢复缓存的边距）"""
+        if skip_layout and self._subplot3_layout is not None:
+            self.fig.subplots_adjust(**self._subplot3_layout)
+        else:
+            self.fig.tight_layout(pad=1.0)
+            params = self.fig.subplotpars
+            self._subplot3_layout = dict(left=params.left, right=params.right,
+                                         bottom=params.bottom, top=params.top)
     
     def update_highlighted_plots(self, clear_fits=False):
         """更新高亮区域和直方图 - 增强版，支持拟合同步"""
@@ -314,7 +424,7 @@ class HistogramPlot(BasePlot):
 
         # 只在明确要求清除时才清空拟合数据（如高亮区域变化）
         if clear_fits and self.shared_fit_data and self.shared_fit_data.has_fits():
-            print("[Fix] Clearing shared fit data from update_highlighted_plots")
+            logger.debug("[Fix] Clearing shared fit data from update_highlighted_plots")
             self.shared_fit_data.clear_fits()
 
         # 调用父类方法更新基础绘图
@@ -327,6 +437,21 @@ class HistogramPlot(BasePlot):
         # 处理主视图subplot3中的拟合显示
         self._update_ax3_fit_display()
     
+    def ax3_fits_displayed(self):
+        """ax3中的拟合曲线是否与共享拟合数据一致（数据未变化且曲线未被清除）"""
+        if self.shared_fit_data is None or getattr(self, '_ax3_fit_version', None) != self.shared_fit_data.version:
+            return False
+        return all(line in self.ax3.lines for line in getattr(self, '_ax3_fit_lines', []))
+    
+    def set_ax3_fits_visible(self, visible):
+        """设置主视图ax3中拟合曲线的可见性，没有拟合曲线时返回False"""
+        if not self._ax3_fit_lines:
+            return False
+        for line in self._ax3_fit_lines:
+            line.set_visible(visible)
+        self.draw_idle()
+        return True
+    
     def _update_ax3_fit_display(self):
         """更新ax3中的拟合曲线显示"""
         highlighted_data = None
@@ -346,9 +471,8 @@ class HistogramPlot(BasePlot):
                         pass
                 self._ax3_fit_lines.clear()
             
-            # 获取高亮数据
-            highlighted_data = -self.data[self.highlight_min:self.highlight_max] if self.invert_data else self.data[self.highlight_min:self.highlight_max]
-            highlighted_data = self.data_cleaner.clean_data(highlighted_data)
+            # 获取高亮数据（只用于取值范围，取反时交换最值即可，不复制取反数据）
+            highlighted_data = self.data_cleaner.clean_data(self.data[self.highlight_min:self.highlight_max])
             
             # 如果有共享拟合数据，在ax3中显示
             if (highlighted_data is not None and 
@@ -356,11 +480,18 @@ class HistogramPlot(BasePlot):
                 self.shared_fit_data is not None and 
                 self.shared_fit_data.has_fits()):
                 
-                print(f"Displaying fits in Main View subplot3")
+                logger.debug("Displaying fits in Main View subplot3")
                 
                 # 获取拟合数据
                 fits, regions = self.shared_fit_data.get_fits()
                 
+                # 高亮数据的取值范围
+                data_min, data_max = highlighted_data.min(), highlighted_data.max()
+                if self.invert_data:
+                    data_min, data_max = -data_max, -data_min
+                data_range = data_max - data_min
+                tolerance = max(0.1 * data_range, 0.001)
+                
                 # 在ax3中绘制拟合曲线
                 for i, fit_data in enumerate(fits):
                     if not fit_data or 'popt' not in fit_data:
@@ -371,10 +502,6 @@ class HistogramPlot(BasePlot):
                     color = fit_data['color']
                     
                     # 检查范围是否有重叠
-                    data_min, data_max = highlighted_data.min(), highlighted_data.max()
-                    data_range = data_max - data_min
-                    tolerance = max(0.1 * data_range, 0.001)
-                    
                     has_overlap = (x_range[1] > data_min - tolerance and x_range[0] < data_max + tolerance)
                     
                     if has_overlap:
@@ -390,7 +517,7 @@ class HistogramPlot(BasePlot):
                         line, = self.ax3.plot(y_fit, x_fit, '-', linewidth=1.0, color=color, zorder=15)
                         self._ax3_fit_lines.append(line)
                         
-                        print(f"Applied fit {i+1} to subplot3: color={color}, range={x_range}")
+                        logger.debug("Applied fit %s to subplot3: color=%s, range=%s", i+1, color, x_range)
                 
                 # 确保轴范围能显示所有拟合曲线
                 if self._ax3_fit_lines:
@@ -403,28 +530,30 @@ class HistogramPlot(BasePlot):
                         new_ymax = max(current_ylim[1], fit_max)
                         if new_ymin != current_ylim[0] or new_ymax != current_ylim[1]:
                             self.ax3.set_ylim(new_ymin, new_ymax)
-                            print(f"Extended ax3 y-axis range to [{new_ymin:.4f}, {new_ymax:.4f}] to show all fits")
+                            logger.debug("Extended ax3 y-axis range to [%.4f, %.4f] to show all fits", new_ymin, new_ymax)
                 
-                print(f"Applied {len(fits)} fits to subplot3 in main view, displayed {len(self._ax3_fit_lines)} lines")
+                logger.debug("Applied %s fits to subplot3 in main view, displayed %s lines", len(fits), len(self._ax3_fit_lines))
             else:
                 if highlighted_data is None:
-                    print("No highlighted data available for subplot3 fit display")
+                    logger.debug("No highlighted data available for subplot3 fit display")
                 elif not hasattr(self, 'ax3'):
-                    print("No ax3 available for fit display")
+                    logger.debug("No ax3 available for fit display")
                 elif self.shared_fit_data is None or not self.shared_fit_data.has_fits():
-                    print("No shared fit data available for subplot3 display")
+                    logger.debug("No shared fit data available for subplot3 display")
+            
+            # 记录ax3中显示的共享拟合版本
+            self._ax3_fit_version = self.shared_fit_data.version if self.shared_fit_data is not None else None
                 
-        except Exception as e:
-            print(f"Error applying fits to subplot3 in main view: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("Error applying fits to subplot3 in main view")
     
     def _calculate_data_hash(self):
-        """计算数据哈希值用于检测数据变化"""
-        if hasattr(self, 'histogram_data') and self.histogram_data is not None:
-            from .plot_utils import DataHasher
-            return DataHasher.calculate_data_hash(self.histogram_data)
-        return None
+        """计算数据哈希值用于检测数据变化（每份histogram_data只完整扫描一次，KDE缓存和拟合保存/恢复共用）"""
+        if self.histogram_data is None:
+            return None
+        if self._histogram_data_hash is None:
+            self._histogram_data_hash = DataHasher.calculate_data_hash(self.histogram_data)
+        return self._histogram_data_hash
     
     # =================== 额外的绘图方法 ===================
     
@@ -435,14 +564,14 @@ class HistogramPlot(BasePlot):
         
         # 先清空拟合数据（数据区域变化）
         if self.shared_fit_data and self.shared_fit_data.has_fits():
-            print("[move_highlight] Clearing shared fit data due to highlight position change")
+            logger.debug("[move_highlight] Clearing shared fit data due to highlight position change")
             self.shared_fit_data.clear_fits()
             
             # 通知父组件清除相关显示
             if hasattr(self, 'parent_dialog') and self.parent_dialog:
                 if hasattr(self.parent_dialog, '_clear_shared_fits_on_data_change'):
                     # 使用父组件的清除方法确保完整清除
-                    print("[move_highlight] Calling parent dialog clear method")
+                    logger.debug("[move_highlight] Calling parent dialog clear method")
                     self.parent_dialog._clear_shared_fits_on_data_change()
         
         self._validate_highlight_indices()
@@ -465,26 +594,18 @@ class HistogramPlot(BasePlot):
             self.highlight_min = self.highlight_max - current_size
         
         # 更新高亮区域绘图
-        if self.highlight_region:
-            self.highlight_region.remove()
-        
-        time_axis = np.arange(len(self.data)) / self.sampling_rate
-        self.highlight_region = self.ax1.axvspan(
-            time_axis[self.highlight_min], 
-            time_axis[self.highlight_max], 
-            alpha=0.3, color='yellow'
-        )
+        self._redraw_highlight_span()
         
         # 更新子图2和子图3（不清除拟合，因为已经在上面清除了）
         self.update_highlighted_plots(clear_fits=False)
-        self.guard.throttled_draw(self)
+        self.draw_idle()
     
     def force_clear_cursors_on_tab_switch(self):
         """在tab切换时强制清理cursor - 修夏bug专用"""
         if hasattr(self.cursor_manager, 'force_clear_on_tab_switch'):
             self.cursor_manager.force_clear_on_tab_switch()
             # 不立即重绘，等待tab切换完成后再重绘
-            print("[TAB_SWITCH_FIX] Called cursor force clear from plot coordinator")
+            logger.debug("[TAB_SWITCH_FIX] Called cursor force clear from plot coordinator")
         """立即同步拟合结果到主视图的subplot3"""
         if hasattr(self.fitting_manager, 'immediate_sync_to_main_view'):
             self.fitting_manager.immediate_sync_to_main_view()
@@ -551,4 +672,4 @@ class HistogramPlot(BasePlot):
         if hasattr(self.cursor_manager, 'force_clear_on_tab_switch'):
             self.cursor_manager.force_clear_on_tab_switch()
             # 不立即重绘，等待tab切换完成后再重绘
-            print("[TAB_SWITCH_FIX] Called cursor force clear from plot coordinator")
+            logger.debug("[TAB_SWITCH_FIX] Called cursor force clear from plot coordinator")
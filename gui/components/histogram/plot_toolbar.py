@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Plot Toolbar - 绘图工具栏
+同一对话框中的matplotlib工具栏共享按钮图标
+"""
+
+from matplotlib.backends.backend_qtagg import NavigationToolbar2QT
+
+
+class SharedIconToolbar(NavigationToolbar2QT):
+    """matplotlib导航工具栏，图标从共享缓存中获取，避免每个工具栏重复读取图标文件"""
+
+    def __init__(self, canvas, parent, icon_cache):
+        """初始化工具栏
+
+        Args:
+            canvas: 绘图画布
+            parent: 父窗口
+            icon_cache: 图标缓存字典 {图标文件名: QIcon}，由同一对话框的工具栏共用
+        """
+        # 父类构造时就会创建按钮图标，缓存需要先设置
+        self._icon_cache = icon_cache
+        super().__init__(canvas, parent)
+
+    def _icon(self, name):
+        """获取按钮图标，首次使用时才从文件创建"""
+        icon = self._icon_cache.get(name)
+        if icon is None:
+            icon = super()._icon(name)
+            self._icon_cache[name] = icon
+        return icon
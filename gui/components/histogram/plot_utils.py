@@ -7,6 +7,7 @@ Plot Utils - 绘图工具函数
 
 import numpy as np
 import time
+from scipy.signal import fftconvolve
 from PyQt6.QtCore import QTimer
 
 
@@ -71,9 +72,13 @@ class DataCleaner:
             return None
             
         try:
-            data = np.asarray(data, dtype=np.float64)
+            data = np.asarray(data)
+            # 保留float32等浮点类型，其余类型转换为float64
+            if not np.issubdtype(data.dtype, np.floating):
+                data = data.astype(np.float64)
             
-            invalid_mask = np.isnan(data) | np.isinf(data)
+            # isfinite一次遍历同时排除NaN和Inf，不需要分别生成两个掩码再合并
+            invalid_mask = ~np.isfinite(data)
             
             if np.any(invalid_mask):
                 print(f"Warning: Found {np.sum(invalid_mask)} invalid values (NaN/Inf) in data")
@@ -83,6 +88,8 @@ class DataCleaner:
                     return None
                 
                 if np.sum(~invalid_mask) >= 2:
+                    # 浮点输入不会被astype复制，插值前先复制，避免改写调用方的数组（通道缓存、绘图数据）
+                    data = data.copy()
                     valid_indices = np.where(~invalid_mask)[0]
                     invalid_indices = np.where(invalid_mask)[0]
                     
@@ -221,3 +228,170 @@ class DataHasher:
             return None
         except:
             return None
+
+
+class HistogramCalculator:
+    """直方图计算工具类"""
+    
+    # 均匀分箱按块计算，每块的临时数组留在CPU缓存中，不必为整段数据分配多个同样大小的临时数组
+    BLOCK_SIZE = 32768
+    
+    @staticmethod
+    def uniform_histogram(data, bins, invert=False, bin_edges=None, data_range=None):
+        """计算直方图，整数箱数时使用均匀分箱的bincount快速路径
+        
+        结果与np.histogram(-data if invert else data, bins=bins)一致，返回(counts, bin_edges)；
+        invert=True时不生成取反后的数据副本；bin_edges为之前对同一数据算出的边界，传入时跳过最值扫描；
+        data_range为已知的(data.min(), data.max())（取反前），传入时同样跳过最值扫描
+        """
+        if not isinstance(bins, (int, np.integer)) or bins <= 0 or len(data) == 0:
+            return np.histogram(-data if invert else data, bins=bins)
+        
+        # 与np.histogram一致：非浮点数据按float64计算（也避免无符号整数取反溢出）
+        data = np.asarray(data)
+        if not np.issubdtype(data.dtype, np.floating):
+            data = data.astype(np.float64)
+        
+        if bin_edges is not None and len(bin_edges) == bins + 1 and bin_edges.dtype == data.dtype:
+            lo, hi = bin_edges[0], bin_edges[-1]
+        else:
+            lo, hi = data_range if data_range is not None else (np.min(data), np.max(data))
+            if invert:
+                lo, hi = -hi, -lo
+            if lo == hi:
+                # 与np.histogram相同：所有值相等时向两侧扩展0.5
+                lo, hi = lo - 0.5, hi + 0.5
+            
+            bin_edges = np.linspace(lo, hi, bins + 1, dtype=data.dtype)
+        norm = bins / (hi - lo)
+        edges = -bin_edges if invert else bin_edges
+        counts = np.zeros(bins, dtype=np.intp)
+        
+        block_size = HistogramCalculator.BLOCK_SIZE
+        for start in range(0, len(data), block_size):
+            block = data[start:start + block_size]
+            # 取反时 -x - lo 与 -lo - x 数值完全相同
+            offset = (-lo - block) if invert else (block - lo)
+            offset *= norm
+            idx = offset.astype(np.intp)
+            np.clip(idx, 0, bins - 1, out=idx)
+            
+            # 与np.histogram相同，按实际边界修正缩放时的舍入误差（取反时与取反后的边界比较）
+            below = (block > edges[idx]) if invert else (block < edges[idx])
+            idx[below] -= 1
+            above = (block <= edges[idx + 1]) if invert else (block >= edges[idx + 1])
+            idx[above & (idx != bins - 1)] += 1
+            counts += np.bincount(idx, minlength=bins)
+        return counts, bin_edges
+
+
+
+class KernelDensityEstimator:
+    """分箱高斯核密度估计：先把数据分到细网格上，再用FFT与高斯核卷积
+    
+    带宽与scipy.stats.gaussian_kde的默认值（Scott规则）相同；计算量与数据量成线性、与网格点数成N·logN，
+    不再是数据量×求值点数
+    """
+    
+    # 网格间距不超过带宽的这个比例，分箱引入的误差远小于曲线的线宽
+    GRID_PER_BANDWIDTH = 8
+    MIN_GRID = 512
+    MAX_GRID = 1 << 17
+    
+    @staticmethod
+    def gaussian_kde(data, x_range):
+        """返回data的高斯核密度在x_range各点的值；数据少于两个点或所有值相等时抛出ValueError"""
+        data = np.asarray(data)
+        n = len(data)
+        if n < 2:
+            raise ValueError("KDE needs at least two data points")
+        
+        std = data.std(ddof=1, dtype=np.float64)
+        if not std > 0:
+            raise ValueError("KDE needs data with non-zero variance")
+        bandwidth = std * n ** (-1 / 5)
+        
+        lo, hi = float(np.min(data)), float(np.max(data))
+        cls = KernelDensityEstimator
+        grid_size = int(np.clip(np.ceil((hi - lo) / bandwidth * cls.GRID_PER_BANDWIDTH), cls.MIN_GRID, cls.MAX_GRID))
+        counts, edges = HistogramCalculator.uniform_histogram(data, grid_size, data_range=(lo, hi))
+        dx = (hi - lo) / grid_size
+        centers = lo + (np.arange(grid_size) + 0.5) * dx
+        
+        # 核只取±4倍带宽（之外的权重小于1e-3），也不超过网格本身
+        half = min(int(np.ceil(4 * bandwidth / dx)), grid_size)
+        offsets = np.arange(-half, half + 1) * dx
+        kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+        
+        density = fftconvolve(counts.astype(np.float64), kernel, mode='same') / n
+        np.maximum(density, 0, out=density)  # 消除FFT舍入产生的微小负值
+        return np.interp(x_range, centers, density)
+
+
+class LineDownsampler:
+    """折线图降采样工具类"""
+    
+    @staticmethod
+    def m4_indices(data, n_buckets):
+        """M4降采样：每个桶保留首、尾、最小值、最大值的下标（按原顺序）
+        
+        按像素列分桶时绘制结果与完整数据一致；数据点不超过4*n_buckets时返回None，直接绘制全部数据
+        """
+        n = len(data)
+        if n_buckets <= 0 or n <= 4 * n_buckets:
+            return None
+        
+        bucket = n // n_buckets
+        m = bucket * n_buckets
+        blocks = data[:m].reshape(n_buckets, bucket)
+        starts = np.arange(0, m, bucket)
+        parts = [starts, starts + np.argmin(blocks, axis=1), starts + np.argmax(blocks, axis=1), starts + (bucket - 1)]
+        
+        # 不足一个桶的尾部单独处理
+        if m < n:
+            tail = data[m:]
+            parts.append(np.array([m, m + np.argmin(tail), m + np.argmax(tail), n - 1]))
+        
+        return np.unique(np.concatenate(parts))
+
+
+class RangeExtrema:
+    """分块最值索引：对一个通道预先计算每块的最小/最大值，之后任意区间的最值只需扫描两端不完整的块"""
+    
+    BLOCK_SIZE = 2048
+    
+    def __init__(self, data):
+        """一次遍历计算各块最值；非浮点数据（绘图前会转换类型）或含NaN/Inf（绘图前会被插值替换）时索引不可用"""
+        self.data = data
+        if not np.issubdtype(data.dtype, np.floating):
+            self.valid = False
+            return
+        n_blocks = len(data) // self.BLOCK_SIZE
+        blocks = data[:n_blocks * self.BLOCK_SIZE].reshape(n_blocks, self.BLOCK_SIZE)
+        self.block_min = blocks.min(axis=1)
+        self.block_max = blocks.max(axis=1)
+        tail = data[n_blocks * self.BLOCK_SIZE:]
+        self.valid = bool(np.isfinite(self.block_min).all() and np.isfinite(self.block_max).all() and
+                          np.isfinite(tail).all())
+    
+    def query(self, start, stop):
+        """返回data[start:stop]的(min, max)，与np.min/np.max结果完全相同；索引不可用或区间为空时返回None"""
+        start, stop, _ = slice(start, stop).indices(len(self.data))
+        if not self.valid or start >= stop:
+            return None
+        
+        size = self.BLOCK_SIZE
+        first = -(-start // size)
+        last = stop // size
+        if first >= last:
+            # 区间不包含完整的块，直接扫描
+            part = self.data[start:stop]
+            return np.min(part), np.max(part)
+        
+        lows = [self.block_min[first:last].min()]
+        highs = [self.block_max[first:last].max()]
+        for part in (self.data[start:first * size], self.data[last * size:stop]):
+            if len(part):
+                lows.append(part.min())
+                highs.append(part.max())
+        return min(lows), max(highs)
@@ -6,6 +6,7 @@ Signal Connector - 信号连接器
 """
 
 from PyQt6.QtWidgets import QMessageBox
+from PyQt6.QtCore import Qt
 
 
 class HistogramSignalConnector:
@@ -13,43 +14,29 @@ class HistogramSignalConnector:
     
     def __init__(self, dialog):
         self.dialog = dialog
-        self._connecting = False
     
     def connect_all_signals(self):
-        """连接所有信号"""
-        if self._connecting:
-            return
+        """连接所有信号（构建界面时调用一次；之后才创建的subplot3画布由connect_subplot3_canvas_signals幂等连接）"""
+        # 文件和数据信号
+        self._connect_file_signals()
         
-        try:
-            self._connecting = True
-            
-            # 文件和数据信号
-            self._connect_file_signals()
-            
-            # 直方图控制信号
-            self._connect_histogram_control_signals()
-            
-            # 标签页切换信号
-            self._connect_tab_signals()
-            
-            # 导出工具信号
-            self._connect_export_signals()
-            
-            # 拟合相关信号
-            self._connect_fit_signals()
-            
-            # Cursor相关信号
-            self._connect_cursor_signals()
-            
-            # Plot canvas信号
-            self._connect_plot_signals()
-            
-        except Exception as e:
-            print(f"Error connecting signals: {e}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            self._connecting = False
+        # 直方图控制信号
+        self._connect_histogram_control_signals()
+        
+        # 标签页切换信号
+        self._connect_tab_signals()
+        
+        # 导出工具信号
+        self._connect_export_signals()
+        
+        # 拟合相关信号
+        self._connect_fit_signals()
+        
+        # Cursor相关信号
+        self._connect_cursor_signals()
+        
+        # Plot canvas信号
+        self._connect_plot_signals()
     
     def _connect_file_signals(self):
         """连接文件相关信号"""
@@ -181,32 +168,24 @@ class HistogramSignalConnector:
         """连接绘图相关信号"""
         # 主视图canvas信号
         if hasattr(self.dialog.plot_canvas, 'cursor_selected'):
-            try:
-                self.dialog.plot_canvas.cursor_selected.disconnect()
-            except:
-                pass
-            self.dialog.plot_canvas.cursor_selected.connect(
-                self.dialog.on_plot_cursor_selected
-            )
+            self._connect_unique(self.dialog.plot_canvas.cursor_selected, self.dialog.on_plot_cursor_selected)
         
         if hasattr(self.dialog.plot_canvas, 'region_selected'):
-            try:
-                self.dialog.plot_canvas.region_selected.disconnect()
-            except:
-                pass
-            self.dialog.plot_canvas.region_selected.connect(
-                self.dialog.on_region_selected
-            )
-        
-        # subplot3 canvas信号
+            self._connect_unique(self.dialog.plot_canvas.region_selected, self.dialog.on_region_selected)
+    
+    def connect_subplot3_canvas_signals(self):
+        """连接subplot3 canvas信号（画布在首次使用时才创建）"""
         if hasattr(self.dialog.subplot3_canvas, 'cursor_selected'):
-            try:
-                self.dialog.subplot3_canvas.cursor_selected.disconnect()
-            except:
-                pass
-            self.dialog.subplot3_canvas.cursor_selected.connect(
-                self.dialog.on_plot_cursor_selected
-            )
+            self._connect_unique(self.dialog.subplot3_canvas.cursor_selected, self.dialog.on_plot_cursor_selected)
+    
+    @staticmethod
+    def _connect_unique(signal, slot):
+        """幂等地连接信号（已连接时不重复连接，无需先断开）"""
+        try:
+            signal.connect(slot, Qt.ConnectionType.UniqueConnection)
+        except TypeError:
+            # 该连接已存在
+            pass
     
     def disconnect_all_signals(self):
         """断开所有信号连接"""
@@ -222,18 +201,30 @@ class DialogEventHandler:
     
     def __init__(self, dialog):
         self.dialog = dialog
+        # 信息/警告/错误提示共用的消息框，首次使用时创建
+        self._message_box = None
+    
+    def _show_message(self, icon, title, message):
+        """用复用的消息框显示提示，不必每次重新创建对话框"""
+        if self._message_box is None:
+            self._message_box = QMessageBox(self.dialog)
+            self._message_box.setStandardButtons(QMessageBox.StandardButton.Ok)
+        self._message_box.setIcon(icon)
+        self._message_box.setWindowTitle(title)
+        self._message_box.setText(message)
+        self._message_box.exec()
     
     def show_error_message(self, title, message):
         """显示错误消息"""
-        QMessageBox.critical(self.dialog, title, message)
+        self._show_message(QMessageBox.Icon.Critical, title, message)
     
     def show_info_message(self, title, message):
         """显示信息消息"""
-        QMessageBox.information(self.dialog, title, message)
+        self._show_message(QMessageBox.Icon.Information, title, message)
     
     def show_warning_message(self, title, message):
         """显示警告消息"""
-        QMessageBox.warning(self.dialog, title, message)
+        self._show_message(QMessageBox.Icon.Warning, title, message)
     
     def ask_confirmation(self, title, message):
         """询问确认"""
@@ -8,9 +8,7 @@ UI Builder - UI构建器
 from PyQt6.QtWidgets import (QVBoxLayout, QHBoxLayout, QGroupBox, QWidget, 
                             QSplitter, QPushButton, QTabWidget, QStatusBar)
 from PyQt6.QtCore import Qt
-from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 
-from .histogram_plot import HistogramPlot
 from .controls import HistogramControlPanel, FileChannelControl
 from .export_tools import ExportToolsPanel
 from .fit_info_panel import FitInfoPanel
@@ -27,6 +25,8 @@ class HistogramUIBuilder:
     def __init__(self, dialog):
         self.dialog = dialog
         self.config = DialogConfig()
+        # 主视图和直方图标签页的工具栏共用的按钮图标 {图标文件名: QIcon}
+        self._toolbar_icons = {}
     
     def build_main_layout(self):
         """构建主布局"""
@@ -258,6 +258,10 @@ class HistogramUIBuilder:
     
     def _create_main_view_tab(self):
         """创建主视图标签页"""
+        # 绘图画布和matplotlib工具栏在创建标签页时才导入
+        from .plot_toolbar import SharedIconToolbar
+        from .histogram_plot import HistogramPlot
+        
         tab = QWidget()
         layout = QVBoxLayout(tab)
         layout.setContentsMargins(*DialogConfig.TAB_MARGINS)
@@ -271,7 +275,7 @@ class HistogramUIBuilder:
         plot_canvas.set_shared_fit_data(self.dialog.shared_fit_data)
         
         # 创建工具栏
-        toolbar = NavigationToolbar(plot_canvas, self.dialog)
+        toolbar = SharedIconToolbar(plot_canvas, self.dialog, self._toolbar_icons)
         toolbar.setStyleSheet(StyleSheets.get_toolbar_style())
         
         layout.addWidget(toolbar)
@@ -284,12 +288,25 @@ class HistogramUIBuilder:
         return tab
     
     def _create_histogram_tab(self):
-        """创建直方图标签页"""
+        """创建直方图标签页（画布在首次使用时由build_histogram_canvas创建）"""
         tab = QWidget()
         layout = QVBoxLayout(tab)
         layout.setContentsMargins(*DialogConfig.TAB_MARGINS)
         layout.setSpacing(DialogConfig.TAB_SPACING)
         
+        # 保存引用
+        self.dialog.histogram_tab = tab
+        
+        return tab
+    
+    def build_histogram_canvas(self):
+        """在直方图标签页中创建绘图画布和工具栏，返回画布"""
+        # 绘图画布和matplotlib工具栏在创建画布时才导入
+        from .plot_toolbar import SharedIconToolbar
+        from .histogram_plot import HistogramPlot
+        
+        layout = self.dialog.histogram_tab.layout()
+        
         # 创建绘图画布
         subplot3_canvas = HistogramPlot(self.dialog, 
                                        width=DialogConfig.PLOT_WIDTH, 
@@ -298,17 +315,16 @@ class HistogramUIBuilder:
         subplot3_canvas.set_shared_fit_data(self.dialog.shared_fit_data)
         
         # 创建工具栏
-        toolbar = NavigationToolbar(subplot3_canvas, self.dialog)
+        toolbar = SharedIconToolbar(subplot3_canvas, self.dialog, self._toolbar_icons)
         toolbar.setStyleSheet(StyleSheets.get_toolbar_style())
         
         layout.addWidget(toolbar)
         layout.addWidget(subplot3_canvas)
         
         # 保存引用
-        self.dialog.subplot3_canvas = subplot3_canvas
         self.dialog.subplot3_toolbar = toolbar
         
-        return tab
+        return subplot3_canvas
     
     def _build_right_panel(self):
         """构建右侧面板 - 优化版，上下分割布局"""